@@ -4,20 +4,147 @@ ROMA Configuration Loader
 支持从YAML文件加载ROMA配置，并提供环境变量替换。
 """
 
+import copy
 import logging
 import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
-try:
-    from omegaconf import OmegaConf
+logger = logging.getLogger(__name__)
 
-    HAS_OMEGACONF = True
-except ImportError:
-    HAS_OMEGACONF = False
+# yaml 延迟到首次加载profile时导入
+_yaml: Any = None
+_YamlLoader: Any = None
+HAS_YAML: bool | None = None
 
+# ${VAR_NAME} 环境变量占位符
+_ENV_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
 
-logger = logging.getLogger(__name__)
+# 已解析YAML缓存（未替换环境变量）: path -> (mtime, size, config)
+_YAML_CACHE: OrderedDict[str, tuple[float, int, dict[str, Any]]] = OrderedDict()
+_YAML_CACHE_MAX_SIZE = 100
+
+# 合并后配置缓存: profile -> _ProfileEntry
+_MERGED_CACHE: dict[str, "_ProfileEntry"] = {}
+
+# 区分"键不存在"与"值为None"
+_MISSING: Any = object()
+
+
+def _import_yaml() -> bool:
+    """首次使用时导入yaml并缓存结果，优先使用libyaml的CSafeLoader"""
+    global _yaml, _YamlLoader, HAS_YAML
+    if HAS_YAML is None:
+        try:
+            import yaml
+        except ImportError:
+            HAS_YAML = False
+        else:
+            _yaml = yaml
+            _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            HAS_YAML = True
+    return HAS_YAML
+
+
+def _yaml_root_is_mapping(stream: Any) -> bool:
+    """只读取前几个解析事件，判断文档根节点是否为mapping（空文档视为合法）"""
+    for event in _yaml.parse(stream, Loader=_YamlLoader):
+        if isinstance(event, (_yaml.StreamStartEvent, _yaml.DocumentStartEvent)):
+            continue
+        return isinstance(event, (_yaml.MappingStartEvent, _yaml.StreamEndEvent))
+    return True
+
+
+def _freeze(value: Any) -> Any:
+    """将嵌套的dict/list转换为只读的MappingProxyType/tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _merge_cow(base: Mapping[str, Any], update: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    写时复制合并
+
+    只为被update覆盖的路径创建新dict，未覆盖的子树直接共享base中的只读引用。
+    与默认值相等的叶子复用默认值对象，其余字符串叶子做intern，
+    使多个profile的合并结果共享同一份字符串。
+    使用显式栈迭代，避免深层配置的递归开销。
+    """
+    merged = dict(base)
+    stack: list[tuple[dict[str, Any], Mapping[str, Any]]] = [(merged, update)]
+    while stack:
+        target, overrides = stack.pop()
+        for key, value in overrides.items():
+            current = target.get(key, _MISSING)
+            if isinstance(current, Mapping) and isinstance(value, Mapping):
+                child = dict(current)
+                target[key] = child
+                stack.append((child, value))
+            elif type(value) is type(current) and value == current:
+                continue
+            elif type(value) is str:
+                target[key] = sys.intern(value)
+            else:
+                target[key] = value
+    return merged
+
+
+def _substitute_env_vars(config: Any) -> Any:
+    """递归替换环境变量（共享的只读默认值子树同时还原为普通dict/list）"""
+    if isinstance(config, Mapping):
+        return {k: _substitute_env_vars(v) for k, v in config.items()}
+    elif isinstance(config, (list, tuple)):
+        return [_substitute_env_vars(v) for v in config]
+    elif isinstance(config, str):
+        # 替换 ${VAR_NAME} 格式（支持嵌入在字符串中），未设置的变量保持原样
+        if "$" not in config:
+            return config
+        return _ENV_RE.sub(lambda m: os.environ.get(m.group(1), m.group(0)), config)
+    else:
+        return config
+
+
+def _flatten_config(config: Mapping[str, Any], prefix: str = "") -> dict[str, Any]:
+    """构建点分隔路径索引，如 {"roma": {...}, "roma.model": "..."}"""
+    flat: dict[str, Any] = {}
+    for key, value in config.items():
+        if not isinstance(key, str):
+            continue
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, Mapping):
+            flat.update(_flatten_config(value, f"{path}."))
+    return flat
+
+
+class _ProfileEntry:
+    """
+    单个profile的缓存
+
+    保存与默认值合并后、尚未替换环境变量的配置树。完整解析在首次load()时进行，
+    get()只解析被访问的节点。
+    """
+
+    __slots__ = ("token", "raw", "raw_flat", "config", "flat", "resolved")
+
+    def __init__(self, token: tuple[float, int] | None, raw: dict[str, Any]):
+        self.token = token
+        self.raw = raw
+        self.raw_flat = _flatten_config(raw)
+        # 完整解析后的配置及其索引
+        self.config: dict[str, Any] | None = None
+        self.flat: dict[str, Any] | None = None
+        # get() 按需解析的结果
+        self.resolved: dict[str, Any] = {}
 
 
 class ROMAConfig:
@@ -27,33 +154,35 @@ class ROMAConfig:
     支持多环境配置（dev/prod）和环境变量替换。
     """
 
-    # 默认配置
-    DEFAULTS: dict[str, Any] = {
-        "pipeline": {
-            "enabled_agents": ["perception", "executor", "reflection", "aggregator"],
-            "skip_planner": True,
-            "max_retries": 2,
-            "timeout": 300,
-        },
-        "toolkits": {
-            "anvil_simulator": {
-                "enabled": True,
-                "fork_url": "https://eth.llamarpc.com",
-                "timeout": 30,
+    # 默认配置（只读，合并时按需复制）
+    DEFAULTS: Mapping[str, Any] = _freeze(
+        {
+            "pipeline": {
+                "enabled_agents": ["perception", "executor", "reflection", "aggregator"],
+                "skip_planner": True,
+                "max_retries": 2,
+                "timeout": 300,
             },
-            "tee_manager": {
-                "enabled": True,
-                "backend": "docker-sim",
+            "toolkits": {
+                "anvil_simulator": {
+                    "enabled": True,
+                    "fork_url": "https://eth.llamarpc.com",
+                    "timeout": 30,
+                },
+                "tee_manager": {
+                    "enabled": True,
+                    "backend": "docker-sim",
+                },
+                "forensics_analyzer": {
+                    "enabled": True,
+                },
             },
-            "forensics_analyzer": {
+            "roma": {
                 "enabled": True,
+                "model": "openai/gpt-4o",
             },
-        },
-        "roma": {
-            "enabled": True,
-            "model": "openai/gpt-4o",
-        },
-    }
+        }
+    )
 
     def __init__(self, profile: str = "dev"):
         """
@@ -64,17 +193,44 @@ class ROMAConfig:
         """
         self.profile = profile
         self._config: dict[str, Any] | None = None
+        self._entry: _ProfileEntry | None = None
 
     def load(self) -> dict[str, Any]:
-        """加载配置"""
+        """加载配置（每个实例持有独立副本，修改不会影响其他调用方）"""
+        entry = self._get_entry()
         if self._config is None:
-            self._config = self._load_config()
+            self._config = _thaw(_resolve(entry))
         return self._config
 
+    def _get_entry(self) -> _ProfileEntry:
+        """获取共享的profile缓存，每次访问都检查配置文件是否变化"""
+        token = self._stat_token()
+        entry = self._entry
+        if entry is None or entry.token != token:
+            entry = _MERGED_CACHE.get(self.profile)
+            if entry is None or entry.token != token:
+                entry = _ProfileEntry(token, self._load_config())
+                _MERGED_CACHE[self.profile] = entry
+            self._entry = entry
+            self._config = None
+        return entry
+
+    def _config_file(self) -> Path:
+        """profile对应的YAML文件路径"""
+        return Path(__file__).parent / "profiles" / f"{self.profile}.yaml"
+
+    def _stat_token(self) -> tuple[float, int] | None:
+        """配置文件的失效标记 (mtime, size)，文件不存在时为None"""
+        try:
+            st = self._config_file().stat()
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
     def _load_config(self) -> dict[str, Any]:
         """加载配置文件"""
         # 尝试从YAML文件加载
-        if HAS_OMEGACONF:
+        if _import_yaml():
             yaml_config = self._load_yaml_config()
             if yaml_config:
                 return self._merge_with_defaults(yaml_config)
@@ -83,98 +239,117 @@ class ROMAConfig:
         return self._load_from_env()
 
     def _load_yaml_config(self) -> dict[str, Any] | None:
-        """从YAML文件加载配置"""
-        config_dir = Path(__file__).parent / "profiles"
-        config_file = config_dir / f"{self.profile}.yaml"
+        """从YAML文件加载配置（环境变量在访问时替换）"""
+        config_file = self._config_file()
 
         if not config_file.exists():
             logger.warning(f"配置文件不存在: {config_file}")
             return None
 
         try:
-            cfg = OmegaConf.load(config_file)
-            # 替换环境变量
-            cfg = self._substitute_env_vars(cfg)
-            return OmegaConf.to_container(cfg, resolve=True)
+            st = config_file.stat()
+            cache_key = str(config_file)
+
+            # 文件未变化时直接复用已解析结果
+            cached = _YAML_CACHE.get(cache_key)
+            if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+                _YAML_CACHE.move_to_end(cache_key)
+                return copy.deepcopy(cached[2])
+
+            with open(config_file, "rb") as f:
+                # 根节点不是mapping时在首个节点事件处即失败，无需完整解析
+                if not _yaml_root_is_mapping(f):
+                    logger.error(f"配置文件格式错误，根节点必须为mapping: {config_file}")
+                    return None
+                f.seek(0)
+                raw = _yaml.load(f, Loader=_YamlLoader) or {}
+
+            _YAML_CACHE[cache_key] = (st.st_mtime, st.st_size, raw)
+            _YAML_CACHE.move_to_end(cache_key)
+            if len(_YAML_CACHE) > _YAML_CACHE_MAX_SIZE:
+                _YAML_CACHE.popitem(last=False)
+
+            return copy.deepcopy(raw)
         except Exception as e:
             logger.error(f"加载配置文件失败: {e}")
             return None
 
     def _substitute_env_vars(self, config: Any) -> Any:
         """递归替换环境变量"""
-        if isinstance(config, dict):
-            return {k: self._substitute_env_vars(v) for k, v in config.items()}
-        elif isinstance(config, list):
-            return [self._substitute_env_vars(v) for v in config]
-        elif isinstance(config, str):
-            # 替换 ${VAR_NAME} 格式
-            if config.startswith("${") and config.endswith("}"):
-                var_name = config[2:-1]
-                return os.getenv(var_name, config)
-            return config
-        else:
-            return config
-
-    def _merge_with_defaults(self, config: dict[str, Any]) -> dict[str, Any]:
-        """与默认配置合并"""
-        import copy
+        return _substitute_env_vars(config)
 
-        merged = copy.deepcopy(self.DEFAULTS)
-
-        def deep_update(base: dict, update: dict) -> dict:
-            """递归更新字典"""
-            for key, value in update.items():
-                if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                    deep_update(base[key], value)
-                else:
-                    base[key] = value
-            return base
-
-        return deep_update(merged, config)
+    def _merge_with_defaults(self, config: Mapping[str, Any]) -> dict[str, Any]:
+        """与默认配置合并（未被覆盖的子树共享只读默认值）"""
+        return _merge_cow(self.DEFAULTS, config)
 
     def _load_from_env(self) -> dict[str, Any]:
         """从环境变量加载配置"""
-        import copy
-
-        config = copy.deepcopy(self.DEFAULTS)
+        roma: dict[str, Any] = {}
+        anvil: dict[str, Any] = {}
+        tee: dict[str, Any] = {}
 
         # LLM配置
         if os.getenv("ROMA_API_KEY"):
-            config["roma"]["api_key"] = os.getenv("ROMA_API_KEY")
+            roma["api_key"] = os.getenv("ROMA_API_KEY")
         if os.getenv("ROMA_MODEL"):
-            config["roma"]["model"] = os.getenv("ROMA_MODEL")
+            roma["model"] = os.getenv("ROMA_MODEL")
 
         # Anvil配置
         if os.getenv("MAINNET_RPC_URL"):
-            config["toolkits"]["anvil_simulator"]["fork_url"] = os.getenv("MAINNET_RPC_URL")
+            anvil["fork_url"] = os.getenv("MAINNET_RPC_URL")
 
         # TEE配置
         if os.getenv("TEE_BACKEND"):
-            config["toolkits"]["tee_manager"]["backend"] = os.getenv("TEE_BACKEND")
+            tee["backend"] = os.getenv("TEE_BACKEND")
 
-        return config
+        return self._merge_with_defaults(
+            {"roma": roma, "toolkits": {"anvil_simulator": anvil, "tee_manager": tee}}
+        )
 
     def get(self, key: str, default: Any = None) -> Any:
         """
         获取配置值
 
-        支持点分隔的路径，如 "roma.model"
+        支持点分隔的路径，如 "roma.model"。未调用过load()时只解析所访问的节点。
         """
-        config = self.load()
-        keys = key.split(".")
+        return _lookup(self._get_entry(), key, default)
+
+
+def _resolve(entry: _ProfileEntry) -> dict[str, Any]:
+    """完整解析profile缓存（替换环境变量），结果保存在缓存中供所有调用方复制"""
+    if entry.config is None:
+        entry.config = _substitute_env_vars(entry.raw)
+        entry.flat = _flatten_config(entry.config)
+    return entry.config
 
-        value = config
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                return default
 
-        return value if value is not None else default
+def _thaw(value: Any) -> Any:
+    """复制嵌套的dict/list，调用方拿到的配置与共享缓存互不影响"""
+    if isinstance(value, dict):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _lookup(entry: _ProfileEntry, key: str, default: Any) -> Any:
+    """在profile缓存中按点分隔路径查找，按需替换环境变量"""
+    if entry.flat is not None:
+        value = entry.flat.get(key)
+    elif key in entry.resolved:
+        value = entry.resolved[key]
+    else:
+        value = _substitute_env_vars(entry.raw_flat.get(key))
+        entry.resolved[key] = value
+    if value is None:
+        return default
+    # 子树返回副本，避免调用方修改共享缓存
+    return _thaw(value) if isinstance(value, (dict, list)) else value
 
 
 # 全局配置实例
 _configs: dict[str, ROMAConfig] = {}
+_configs_lock = threading.Lock()
 
 
 def get_roma_config(profile: str = "dev") -> ROMAConfig:
@@ -187,9 +362,17 @@ def get_roma_config(profile: str = "dev") -> ROMAConfig:
     Returns:
         ROMAConfig实例
     """
-    if profile not in _configs:
-        _configs[profile] = ROMAConfig(profile)
-    return _configs[profile]
+    # 快速路径：dict读取在GIL下是原子的，无需加锁
+    config = _configs.get(profile)
+    if config is not None:
+        return config
+
+    with _configs_lock:
+        config = _configs.get(profile)
+        if config is None:
+            config = ROMAConfig(profile)
+            _configs[profile] = config
+        return config
 
 
 def load_profile(profile: str = "dev") -> dict[str, Any]:
@@ -202,4 +385,21 @@ def load_profile(profile: str = "dev") -> dict[str, Any]:
     Returns:
         配置字典
     """
-    return get_roma_config(profile).load()
+    return _thaw(_resolve(get_roma_config(profile)._get_entry()))
+
+
+def get_value(profile: str, key: str, default: Any = None) -> Any:
+    """
+    读取指定profile的单个配置项
+
+    直接查询模块级缓存，不复制整份配置。
+
+    Args:
+        profile: 配置环境 (dev, prod)
+        key: 点分隔的路径，如 "roma.model"
+        default: 未配置时的默认值
+
+    Returns:
+        配置值
+    """
+    return _lookup(get_roma_config(profile)._get_entry(), key, default)
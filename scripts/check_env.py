@@ -9,10 +9,14 @@ SSSEA Environment Check Script
 4. 必要的 Python 包
 """
 
+import asyncio
+import importlib.metadata
 import importlib.util
-import subprocess
+import os
+import shutil
 import sys
 from pathlib import Path
+from typing import Any
 
 
 class Colors:
@@ -50,23 +54,67 @@ def check_python_version() -> tuple[bool, str]:
     return False, f"Python {version.major}.{version.minor}.{version.micro} (需要 >= 3.12)"
 
 
+def _probe_version(path: str) -> str | None:
+    """执行 `<path> --version` 并返回首行输出"""
+    import subprocess
+
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=5)
+        return result.stdout.strip().split("\n")[0] or None
+    except Exception:
+        return None
+
+
 def check_command_exists(command: str) -> tuple[bool, str]:
     """检查命令是否存在"""
-    try:
-        result = subprocess.run(["which", command], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            # 获取版本信息
-            try:
-                version_result = subprocess.run(
-                    [command, "--version"], capture_output=True, text=True, timeout=5
-                )
-                version = version_result.stdout.strip().split("\n")[0]
-                return True, f"{command}: {version}"
-            except Exception:
-                return True, f"{command}: 已安装"
+    path = shutil.which(command)
+    if path is None:
         return False, f"{command}: 未找到"
-    except Exception:
-        return False, f"{command}: 检查失败"
+    version = _probe_version(path)
+    return True, f"{command}: {version}" if version else f"{command}: 已安装"
+
+
+def check_foundry_tools(
+    commands: tuple[str, ...] = ("forge", "anvil", "cast"),
+) -> list[tuple[str, bool, str]]:
+    """
+    检查 Foundry 工具链
+
+    Foundry 的各工具安装在同一目录且版本一致，只对第一个找到的工具执行一次
+    --version，其余工具通过同目录下的可执行文件推断。
+    """
+    found: dict[str, str] = {}
+    for command in commands:
+        path = shutil.which(command)
+        if path is not None:
+            found[command] = path
+            break
+
+    if not found:
+        return [(command, False, f"{command}: 未找到") for command in commands]
+
+    probed, probed_path = next(iter(found.items()))
+    install_dir = Path(probed_path).parent
+    version = _probe_version(probed_path)
+
+    results = []
+    for command in commands:
+        if command == probed:
+            msg = f"{command}: {version}" if version else f"{command}: 已安装"
+            results.append((command, True, msg))
+            continue
+        sibling = install_dir / command
+        if sibling.is_file() and os.access(sibling, os.X_OK):
+            path: str | None = str(sibling)
+        else:
+            path = shutil.which(command)
+        if path is None:
+            results.append((command, False, f"{command}: 未找到"))
+        elif version and Path(path).parent == install_dir:
+            results.append((command, True, f"{command}: 已安装 (与 {probed} 同版本)"))
+        else:
+            results.append((command, *check_command_exists(command)))
+    return results
 
 
 def check_python_package(package: str, import_name: str = None) -> tuple[bool, str]:
@@ -74,6 +122,12 @@ def check_python_package(package: str, import_name: str = None) -> tuple[bool, s
     if import_name is None:
         import_name = package
 
+    # 优先读取 dist-info 元数据，避免执行包的顶层代码
+    try:
+        return True, f"{package}: {importlib.metadata.version(package)}"
+    except importlib.metadata.PackageNotFoundError:
+        pass
+
     spec = importlib.util.find_spec(import_name)
     if spec is not None:
         try:
@@ -85,15 +139,12 @@ def check_python_package(package: str, import_name: str = None) -> tuple[bool, s
     return False, f"{package}: 未安装"
 
 
-def check_rpc_connectivity(rpc_url: str) -> tuple[bool, str]:
+async def check_rpc_connectivity(client: Any, rpc_url: str) -> tuple[bool, str]:
     """检查 RPC 连接性"""
     try:
-        import httpx
-
-        response = httpx.post(
+        response = await client.post(
             rpc_url,
             json={"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1},
-            timeout=10,
         )
         if response.status_code == 200:
             data = response.json()
@@ -102,12 +153,23 @@ def check_rpc_connectivity(rpc_url: str) -> tuple[bool, str]:
                 return True, f"RPC 连接成功 (区块: {block_num})"
             return True, "RPC 连接成功"
         return False, f"RPC 返回错误: {response.status_code}"
-    except ImportError:
-        return False, "httpx 未安装，跳过 RPC 检查"
     except Exception as e:
         return False, f"RPC 连接失败: {e}"
 
 
+async def check_rpc_endpoints(rpc_urls: list[str]) -> list[tuple[bool, str]]:
+    """并发检查多个 RPC，共享同一个连接池"""
+    try:
+        import httpx
+    except ImportError:
+        return [(False, "httpx 未安装，跳过 RPC 检查")] * len(rpc_urls)
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        return list(
+            await asyncio.gather(*(check_rpc_connectivity(client, rpc) for rpc in rpc_urls))
+        )
+
+
 def main():
     print_header("SSSEA 环境检查")
     print()
@@ -127,8 +189,7 @@ def main():
 
     # 2. 检查 Foundry/Anvil
     print_header("2. Foundry/Anvil 检查")
-    for cmd in ["anvil", "cast", "forge"]:
-        passed, msg = check_command_exists(cmd)
+    for cmd, passed, msg in check_foundry_tools():
         results.append((passed, msg))
         if passed:
             print_success(msg)
@@ -160,8 +221,7 @@ def main():
         "https://eth.llamarpc.com",
         "https://rpc.ankr.com/eth",
     ]
-    for rpc in rpc_urls:
-        passed, msg = check_rpc_connectivity(rpc)
+    for rpc, (passed, msg) in zip(rpc_urls, asyncio.run(check_rpc_endpoints(rpc_urls))):
         results.append((passed, msg))
         if passed:
             print_success(f"{rpc[:30]}... - {msg}")
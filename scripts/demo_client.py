@@ -14,7 +14,19 @@ from pathlib import Path
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import httpx
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson 可选，缺失时回退到标准库
+
+    def _json_dumps(obj: object) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+    _json_loads = json.loads
+
+_JSON_HEADERS = {"content-type": "application/json"}
 
 # =============================================================================
 # Demo Scenarios
@@ -62,6 +74,11 @@ SCENARIOS = {
     },
 }
 
+# 预先构建每个场景的请求体和 tool arguments，避免每次调用时重新组装/序列化
+for _scenario in SCENARIOS.values():
+    _scenario["_payload"] = {"user_intent": _scenario["user_intent"], **_scenario["tx"]}
+    _scenario["_arguments"] = _json_dumps(_scenario["_payload"]).decode()
+
 
 # =============================================================================
 # Demo Client
@@ -72,11 +89,18 @@ class SSSEAClient:
     """SSSEA 客户端"""
 
     def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+        import httpx
+
         self.base_url = base_url
         # trust_env=False 禁用从环境变量读取代理
+        # 同一 host 的请求复用 keep-alive 连接，连接失败时自动重试一次
         self.client = httpx.AsyncClient(
             timeout=30.0,
             trust_env=False,  # 禁用代理
+            transport=httpx.AsyncHTTPTransport(
+                retries=1,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+            ),
         )
 
     async def health_check(self) -> bool:
@@ -90,7 +114,7 @@ class SSSEAClient:
     async def list_tools(self) -> dict:
         """列出可用工具"""
         response = await self.client.get(f"{self.base_url}/v1/tools")
-        return response.json()
+        return _json_loads(response.content)
 
     async def simulate_transaction(
         self,
@@ -100,12 +124,26 @@ class SSSEAClient:
         tx_value: str = "0",
         tx_data: str = "0x",
         chain_id: int = 1,
+        arguments: str | None = None,
     ) -> dict:
         """
         通过 OpenAI 兼容接口调用模拟
 
         模拟 DeFi 助手 Agent 调用 SSSEA 的场景。
+        arguments 为预序列化的 tool arguments，为 None 时按参数生成。
         """
+        if arguments is None:
+            arguments = _json_dumps(
+                {
+                    "user_intent": user_intent,
+                    "chain_id": chain_id,
+                    "tx_from": tx_from,
+                    "tx_to": tx_to,
+                    "tx_value": tx_value,
+                    "tx_data": tx_data,
+                }
+            ).decode()
+
         payload = {
             "model": "sssea-v1-mock",
             "messages": [
@@ -123,16 +161,7 @@ class SSSEAClient:
                     "type": "function",
                     "function": {
                         "name": "simulate_tx",
-                        "arguments": json.dumps(
-                            {
-                                "user_intent": user_intent,
-                                "chain_id": chain_id,
-                                "tx_from": tx_from,
-                                "tx_to": tx_to,
-                                "tx_value": tx_value,
-                                "tx_data": tx_data,
-                            }
-                        ),
+                        "arguments": arguments,
                     },
                 }
             ],
@@ -140,24 +169,25 @@ class SSSEAClient:
 
         response = await self.client.post(
             f"{self.base_url}/v1/chat/completions",
-            json=payload,
+            content=_json_dumps(payload),
+            headers=_JSON_HEADERS,
         )
 
-        return response.json()
+        return _json_loads(response.content)
 
     async def simulate_direct(self, user_intent: str, **tx_params) -> dict:
         """直接调用模拟接口（简化版）"""
-        payload = {
-            "user_intent": user_intent,
-            **tx_params,
-        }
+        return await self.simulate_payload({"user_intent": user_intent, **tx_params})
 
+    async def simulate_payload(self, payload: dict) -> dict:
+        """使用已构建好的请求体调用模拟接口"""
         response = await self.client.post(
             f"{self.base_url}/api/v1/simulate",
-            json=payload,
+            content=_json_dumps(payload),
+            headers=_JSON_HEADERS,
         )
 
-        return response.json()
+        return _json_loads(response.content)
 
     async def close(self):
         """关闭客户端"""
@@ -214,8 +244,11 @@ class DemoRunner:
         # 3. 运行场景
         scenarios = [scenario_name] if scenario_name else list(SCENARIOS.keys())
 
-        for scenario_id in scenarios:
-            await self.run_scenario(scenario_id)
+        # 各场景相互独立，并发执行；输出按场景顺序打印
+        outcomes = await asyncio.gather(*(self._run_scenario_collect(sid) for sid in scenarios))
+        for passed, lines in outcomes:
+            print("\n".join(lines))
+            self._record(passed)
 
         # 4. 总结
         self.print_header("测试总结")
@@ -230,21 +263,31 @@ class DemoRunner:
 
     async def run_scenario(self, scenario_id: str):
         """运行单个场景"""
+        passed, lines = await self._run_scenario_collect(scenario_id)
+        print("\n".join(lines))
+        self._record(passed)
+
+    def _record(self, passed: bool | None):
+        """记录场景结果（None 表示无预期结果，不计入统计）"""
+        if passed is True:
+            self.passed += 1
+        elif passed is False:
+            self.failed += 1
+
+    async def _run_scenario_collect(self, scenario_id: str) -> tuple[bool | None, list[str]]:
+        """运行单个场景，返回 (是否通过, 待打印的输出行)"""
         scenario = SCENARIOS.get(scenario_id)
         if not scenario:
-            print(f"    ❌ 场景不存在: {scenario_id}")
-            self.failed += 1
-            return
+            return False, [f"    ❌ 场景不存在: {scenario_id}"]
 
-        self.print_section(f"场景: {scenario['name']}")
-        print(f"    描述: {scenario['description']}")
-        print(f"    意图: {scenario['user_intent']}")
+        lines = [
+            f"\n>>> 场景: {scenario['name']}",
+            f"    描述: {scenario['description']}",
+            f"    意图: {scenario['user_intent']}",
+        ]
 
         # 调用模拟
-        result = await self.client.simulate_direct(
-            user_intent=scenario["user_intent"],
-            **scenario["tx"],
-        )
+        result = await self.client.simulate_payload(scenario["_payload"])
 
         # 解析结果
         verdict = result.get("verdict", "UNKNOWN")
@@ -253,30 +296,29 @@ class DemoRunner:
         anomalies = result.get("anomalies", [])
         attestation = result.get("attestation", "")
 
-        # 打印结果
-        print("\n    审计结果:")
-        self.print_result("风险等级", verdict)
-        self.print_result("置信度", f"{confidence:.0%}")
-        self.print_result("摘要", summary)
+        # 审计结果
+        lines.append("\n    审计结果:")
+        lines.append(f"    风险等级: {verdict}")
+        lines.append(f"    置信度: {confidence:.0%}")
+        lines.append(f"    摘要: {summary}")
 
         if anomalies:
-            print("\n    检测到的问题:")
-            for a in anomalies:
-                print(f"      - {a}")
+            lines.append("\n    检测到的问题:")
+            lines.extend(f"      - {a}" for a in anomalies)
 
         if attestation:
             attestation_short = attestation[:40] + "..." if len(attestation) > 40 else attestation
-            print(f"\n    OML 证明: {attestation_short}")
+            lines.append(f"\n    OML 证明: {attestation_short}")
 
         # 验证预期结果
         expected = scenario.get("expected_verdict")
-        if expected:
-            if verdict == expected:
-                print(f"\n    ✅ 符合预期 ({expected})")
-                self.passed += 1
-            else:
-                print(f"\n    ❌ 不符合预期 (预期: {expected}, 实际: {verdict})")
-                self.failed += 1
+        if not expected:
+            return None, lines
+        if verdict == expected:
+            lines.append(f"\n    ✅ 符合预期 ({expected})")
+            return True, lines
+        lines.append(f"\n    ❌ 不符合预期 (预期: {expected}, 实际: {verdict})")
+        return False, lines
 
 
 # =============================================================================
@@ -10,21 +10,25 @@ ROMA Agent Pipeline for SSSEA
 """
 
 from .aggregator import AggregatorAgent
-from .base import AgentContext, AgentResult, BaseAgent
+from .base import AgentContext, AgentResult, BaseAgent, SimulationSummary
 from .executor import ExecutorAgent
 from .perception import PerceptionAgent
-from .pipeline import SSSEAPipeline
-from .planner import PlannerAgent
-from .reflection import ReflectionAgent
+from .pipeline import SSSEAPipeline, shutdown_pipelines
+from .planner import CycleDetectedError, PlannerAgent
+from .reflection import FailureFlag, ReflectionAgent
 
 __all__ = [
     "BaseAgent",
     "AgentResult",
     "AgentContext",
+    "SimulationSummary",
     "PerceptionAgent",
     "PlannerAgent",
+    "CycleDetectedError",
     "ExecutorAgent",
     "ReflectionAgent",
+    "FailureFlag",
     "AggregatorAgent",
     "SSSEAPipeline",
+    "shutdown_pipelines",
 ]
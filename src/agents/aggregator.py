@@ -5,13 +5,36 @@ Aggregator Agent - 聚合层Agent
 """
 
 import logging
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 
-from .base import AgentContext, AgentResult, BaseAgent
+from ..toolkits.forensics_toolkit import max_call_depth
+from .base import AgentContext, AgentResult, BaseAgent, SimulationSummary
 
 logger = logging.getLogger(__name__)
 
+# 风险等级，按严重程度递增
+_RISK_LEVELS = ("SAFE", "WARNING", "CRITICAL")
+_MAX_RISK_SCORE = 1.0
+
+# 各风险等级的推荐操作
+_REC_CRITICAL = (
+    "立即停止此交易",
+    "检查目标合约地址是否正确",
+    "验证交易calldata是否被篡改",
+    "建议人工审核",
+)
+_REC_WARNING = (
+    "谨慎执行此交易",
+    "确认了解所有潜在风险",
+    "考虑降低交易金额",
+)
+_REC_SAFE = (
+    "交易安全性评估通过",
+    "可以继续执行",
+)
+_REC_BY_LEVEL = {"CRITICAL": _REC_CRITICAL, "WARNING": _REC_WARNING, "SAFE": _REC_SAFE}
+
 
 class AggregatorAgent(BaseAgent):
     """
@@ -39,19 +62,24 @@ class AggregatorAgent(BaseAgent):
         """
         try:
             # 1. 收集所有结果
-            all_results = await self._collect_results(context)
+            all_results = self._collect_results(context)
+            reflection = all_results["reflection"] or {}
 
             # 2. 生成安全评估
-            security_assessment = await self._generate_security_assessment(context, all_results)
+            security_assessment = self._generate_security_assessment(
+                context, all_results, reflection
+            )
 
             # 3. 创建可解释性报告
-            explainability_report = await self._create_explainability_report(context, all_results)
+            explainability_report = self._create_explainability_report(context, all_results)
 
             # 4. 生成推荐操作
-            recommendations = await self._generate_recommendations(context, security_assessment)
+            recommendations = self._generate_recommendations(
+                context, security_assessment, reflection
+            )
 
             # 5. 构建最终报告
-            final_report = await self._build_final_report(
+            final_report = self._build_final_report(
                 context, all_results, security_assessment, explainability_report, recommendations
             )
 
@@ -66,7 +94,7 @@ class AggregatorAgent(BaseAgent):
             )
 
         except Exception as e:
-            logger.error(f"Aggregator Agent执行失败: {e}", exc_info=True)
+            logger.error("Aggregator Agent执行失败: %s", e, exc_info=True)
             return AgentResult(
                 agent_name=self.agent_name,
                 success=False,
@@ -76,58 +104,61 @@ class AggregatorAgent(BaseAgent):
                 confidence=0.0,
             )
 
-    async def _collect_results(self, context: AgentContext) -> dict[str, Any]:
+    def _collect_results(self, context: AgentContext) -> dict[str, Any]:
         """收集所有Agent结果"""
         return {
             "perception": context.metadata.get("intent_analysis"),
             "simulation": context.simulation_result,
+            "simulation_summary": SimulationSummary.from_result(context.simulation_result),
             "reflection": context.metadata.get("reflection"),
+            "override_simulation": context.metadata.get("override_simulation"),
             "execution_history": context.step_history,
             "user_intent": context.user_intent,
         }
 
-    async def _generate_security_assessment(
-        self, context: AgentContext, results: dict[str, Any]
+    def _generate_security_assessment(
+        self, context: AgentContext, results: dict[str, Any], reflection: dict[str, Any]
     ) -> dict[str, Any]:
         """生成安全评估"""
-        assessment = {
-            "risk_level": "SAFE",
-            "confidence": 0.7,
-            "risk_score": 0.0,
-            "findings": [],
-        }
+        # 各来源分别给出 (风险等级序号, 风险分)，最后统一取最大值，结果与判断顺序无关
+        level = 0
+        risk_score = 0.0
+        findings: list[str] = []
 
-        # 从反思结果中获取风险评估
-        reflection = results.get("reflection", {})
+        # 从异常检测结果获取风险（唯一产生findings的来源，先处理）
         if reflection:
+            critical_anomalies = [
+                a for a in reflection.get("anomalies", []) if a.get("severity") == "critical"
+            ]
+            if critical_anomalies:
+                level = 2
+                risk_score = 0.9
+                findings.extend(a["message"] for a in critical_anomalies)
+
+        # 从攻击检测结果获取风险
+        sim: SimulationSummary = results["simulation_summary"]
+        if sim.risk_score:
+            risk_score = max(risk_score, sim.risk_score)
+            if sim.risk_score > 0.7:
+                level = 2
+
+        # 从反思结果中获取风险评估：等级和分数均已达上限时不会再改变结果，直接跳过
+        if reflection and not (level == 2 and risk_score >= _MAX_RISK_SCORE):
             quality = reflection.get("quality_assessment", {})
             if quality.get("has_security_concerns"):
-                assessment["risk_level"] = "WARNING"
-                assessment["risk_score"] = quality.get("risk_score", 0.5)
+                level = max(level, 1)
+                risk_score = max(risk_score, quality.get("risk_score", 0.5))
 
-        # 从攻击检测结果获取风险
-        sim_result = results.get("simulation", {})
-        if isinstance(sim_result, dict):
-            attack_detection = sim_result.get("data", {})
-            if isinstance(attack_detection, dict) and attack_detection.get("risk_score"):
-                assessment["risk_score"] = max(
-                    assessment["risk_score"], attack_detection.get("risk_score", 0)
-                )
-                if attack_detection.get("risk_score", 0) > 0.7:
-                    assessment["risk_level"] = "CRITICAL"
-
-        # 从异常检测结果获取风险
-        if reflection:
-            anomalies = reflection.get("anomalies", [])
-            critical_anomalies = [a for a in anomalies if a.get("severity") == "critical"]
-            if critical_anomalies:
-                assessment["risk_level"] = "CRITICAL"
-                assessment["risk_score"] = 0.9
-                assessment["findings"].extend([a["message"] for a in critical_anomalies])
+        assessment = {
+            "risk_level": _RISK_LEVELS[level],
+            "confidence": 0.7,
+            "risk_score": risk_score,
+            "findings": findings,
+        }
 
         return assessment
 
-    async def _create_explainability_report(
+    def _create_explainability_report(
         self, context: AgentContext, results: dict[str, Any]
     ) -> dict[str, Any]:
         """创建可解释性报告"""
@@ -139,86 +170,77 @@ class AggregatorAgent(BaseAgent):
         }
 
         # 从模拟结果提取证据
-        sim_result = results.get("simulation", {})
-        if isinstance(sim_result, dict):
-            data = sim_result.get("data", {})
-
-            # 资产变动证据
-            asset_changes = data.get("asset_changes", [])
-            if asset_changes:
-                report["evidence"].append(
-                    {
-                        "type": "asset_changes",
-                        "description": f"检测到 {len(asset_changes)} 项资产变动",
-                        "details": asset_changes[:5],
-                    }
-                )
-
-            # 调用链证据
-            call_traces = data.get("call_traces", [])
-            if call_traces:
-                report["evidence"].append(
-                    {
-                        "type": "call_chain",
-                        "description": f"交易包含 {len(call_traces)} 个合约调用",
-                        "max_depth": max((t.get("depth", 0) for t in call_traces), default=0),
-                    }
-                )
+        sim: SimulationSummary = results["simulation_summary"]
+
+        # 资产变动证据
+        asset_changes = sim.asset_changes
+        change_count = len(asset_changes)
+        if change_count:
+            report["evidence"].append(
+                {
+                    "type": "asset_changes",
+                    "description": f"检测到 {change_count} 项资产变动",
+                    "details": asset_changes[:5] if change_count > 5 else asset_changes,
+                }
+            )
+
+        # 调用链证据
+        trace_count = len(sim.call_traces)
+        if trace_count:
+            max_depth = sim.max_call_depth
+            if max_depth is None:
+                max_depth = max_call_depth(sim.call_traces)
+            report["evidence"].append(
+                {
+                    "type": "call_chain",
+                    "description": f"交易包含 {trace_count} 个合约调用",
+                    "max_depth": max_depth,
+                }
+            )
+
+        # 状态覆盖重跑证据：仅供诊断，不参与安全评估
+        override = results.get("override_simulation")
+        if override:
+            overrides = ", ".join(override["state_overrides"])
+            success = SimulationSummary.from_result(override["result"]).success
+            outcome = "成功" if success else "失败"
+            report["evidence"].append(
+                {
+                    "type": "state_override_simulation",
+                    "description": f"在状态覆盖 ({overrides}) 下重新模拟{outcome}，未计入风险评估",
+                    "state_overrides": override["state_overrides"],
+                    "success": success,
+                }
+            )
 
         return report
 
     def _generate_execution_summary(self, results: dict[str, Any]) -> str:
         """生成执行摘要"""
         steps = results.get("execution_history", [])
-        sim_result = results.get("simulation", {})
 
         summary_parts = [
             f"执行了 {len(steps)} 个步骤",
         ]
 
-        if isinstance(sim_result, dict) and sim_result.get("success"):
+        if results["simulation_summary"].success:
             summary_parts.append("交易模拟成功")
         else:
             summary_parts.append("交易模拟失败或未执行")
 
         return "; ".join(summary_parts)
 
-    async def _generate_recommendations(
-        self, context: AgentContext, assessment: dict[str, Any]
+    def _generate_recommendations(
+        self, context: AgentContext, assessment: dict[str, Any], reflection: dict[str, Any]
     ) -> list[str]:
         """生成推荐操作"""
-        recommendations = []
-
-        risk_level = assessment.get("risk_level", "SAFE")
-
-        if risk_level == "CRITICAL":
-            recommendations = [
-                "立即停止此交易",
-                "检查目标合约地址是否正确",
-                "验证交易calldata是否被篡改",
-                "建议人工审核",
-            ]
-        elif risk_level == "WARNING":
-            recommendations = [
-                "谨慎执行此交易",
-                "确认了解所有潜在风险",
-                "考虑降低交易金额",
-            ]
-        else:
-            recommendations = [
-                "交易安全性评估通过",
-                "可以继续执行",
-            ]
+        base = _REC_BY_LEVEL.get(assessment.get("risk_level", "SAFE"), _REC_SAFE)
 
         # 添加反思层的改进建议
-        reflection = context.metadata.get("reflection", {})
-        if reflection:
-            improvements = reflection.get("improvements", [])
-            recommendations.extend(improvements)
-
-        return recommendations
+        improvements = reflection.get("improvements") if reflection else None
+        return [*base, *improvements] if improvements else list(base)
 
-    async def _build_final_report(
+    def _build_final_report(
         self,
         context: AgentContext,
         results: dict[str, Any],
@@ -228,7 +250,7 @@ class AggregatorAgent(BaseAgent):
     ) -> dict[str, Any]:
         """构建最终报告"""
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(UTC).isoformat(timespec="milliseconds"),
             "user_intent": context.user_intent,
             "verdict": {
                 "risk_level": assessment["risk_level"],
@@ -7,32 +7,37 @@ Base Agent Interface for ROMA
 import logging
 import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Any
 
-from pydantic import BaseModel, Field
-
 logger = logging.getLogger(__name__)
 
 
-class AgentContext(BaseModel):
-    """Agent执行上下文"""
+@dataclass(slots=True)
+class AgentContext:
+    """
+    Agent执行上下文
+
+    每个请求创建一次，在各Agent间频繁读写，使用slotted dataclass避免实例 __dict__。
+    """
 
     # 输入数据
-    user_intent: str = Field(..., description="用户意图")
-    tx_data: dict[str, Any] = Field(default_factory=dict, description="交易数据")
-    metadata: dict[str, Any] = Field(default_factory=dict, description="元数据")
+    user_intent: str
+    tx_data: dict[str, Any] = field(default_factory=dict)
+    metadata: dict[str, Any] = field(default_factory=dict)
 
     # 执行状态
     current_step: str = "perception"
-    step_history: list[str] = Field(default_factory=list, description="执行历史")
+    step_history: list[str] = field(default_factory=list)
 
     # 中间结果
     simulation_result: dict[str, Any] | None = None
     analysis_result: dict[str, Any] | None = None
 
     # 配置
-    config: dict[str, Any] = Field(default_factory=dict, description="Agent配置")
+    config: dict[str, Any] = field(default_factory=dict)
 
     def add_history(self, step: str) -> None:
         """添加执行历史"""
@@ -40,21 +45,50 @@ class AgentContext(BaseModel):
         self.current_step = step
 
 
-class AgentResult(BaseModel):
+@dataclass(slots=True)
+class AgentResult:
     """Agent执行结果"""
 
-    agent_name: str = Field(..., description="Agent名称")
-    success: bool = Field(..., description="执行是否成功")
-    execution_time: float = Field(..., description="执行时间（秒）")
-    data: dict[str, Any] = Field(default_factory=dict, description="返回数据")
-    error: str | None = Field(None, description="错误信息")
-    next_step: str | None = Field(None, description="下一步建议")
-    confidence: float = Field(1.0, description="结果置信度")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="执行时间戳")
+    agent_name: str
+    success: bool
+    execution_time: float
+    data: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    next_step: str | None = None
+    confidence: float = 1.0
+    timestamp: datetime = field(default_factory=datetime.utcnow)
 
     def to_dict(self) -> dict[str, Any]:
         """转换为字典格式"""
-        return self.model_dump()
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass(slots=True)
+class SimulationSummary:
+    """聚合层使用的模拟结果摘要，从模拟结果字典中一次性提取"""
+
+    success: bool = False
+    asset_changes: list[dict[str, Any]] = field(default_factory=list)
+    call_traces: list[dict[str, Any]] = field(default_factory=list)
+    risk_score: float = 0.0
+    max_call_depth: int | None = None
+
+    @classmethod
+    def from_result(cls, sim_result: Any) -> "SimulationSummary":
+        """从 ToolkitResult.to_dict() 格式的模拟结果构建摘要"""
+        if not isinstance(sim_result, dict):
+            return cls()
+        success = bool(sim_result.get("success"))
+        data = sim_result.get("data")
+        if not isinstance(data, dict):
+            return cls(success=success)
+        return cls(
+            success=success,
+            asset_changes=data.get("asset_changes") or [],
+            call_traces=data.get("call_traces") or [],
+            risk_score=data.get("risk_score") or 0.0,
+            max_call_depth=data.get("max_call_depth"),
+        )
 
 
 class BaseAgent(ABC):
@@ -68,17 +102,21 @@ class BaseAgent(ABC):
     description: str = "Base agent for ROMA"
 
     def __init__(
-        self, config: dict[str, Any] | None = None, toolkits: dict[str, Any] | None = None
+        self,
+        config: dict[str, Any] | None = None,
+        toolkits: SimpleNamespace | dict[str, Any] | None = None,
     ):
         """
         初始化Agent
 
         Args:
             config: Agent配置
-            toolkits: 可用的工具集
+            toolkits: 可用的工具集，按属性访问（传入dict时自动转换）
         """
         self.config = config or {}
-        self.toolkits = toolkits or {}
+        if toolkits is None or isinstance(toolkits, dict):
+            toolkits = SimpleNamespace(**(toolkits or {}))
+        self.toolkits = toolkits
         self._initialize()
 
     def _initialize(self) -> None:
@@ -147,8 +185,8 @@ class BaseAgent(ABC):
 
     def get_toolkit(self, name: str) -> Any | None:
         """获取指定的工具"""
-        return self.toolkits.get(name)
+        return getattr(self.toolkits, name, None)
 
     def has_toolkit(self, name: str) -> bool:
         """检查工具是否可用"""
-        return name in self.toolkits
+        return getattr(self.toolkits, name, None) is not None
@@ -47,7 +47,7 @@ class ExecutorAgent(BaseAgent):
             return await self._execute_plan(context, plan)
 
         except Exception as e:
-            logger.error(f"Executor Agent执行失败: {e}", exc_info=True)
+            logger.error("Executor Agent执行失败: %s", e, exc_info=True)
             return AgentResult(
                 agent_name=self.agent_name,
                 success=False,
@@ -64,47 +64,56 @@ class ExecutorAgent(BaseAgent):
         # 获取参数
         params = context.metadata.get("key_params", {})
 
+        toolkits = self.toolkits
+        anvil_tool = getattr(toolkits, "anvil_simulator", None)
+        forensics_tool = getattr(toolkits, "forensics_analyzer", None)
+
         # 1. 启动Anvil
-        if self.has_toolkit("anvil_simulator"):
-            anvil_tool = self.get_toolkit("anvil_simulator")
-            assert anvil_tool is not None
-            start_result = await anvil_tool(action="start")
+        if anvil_tool is not None:
+            # 优先复用Perception阶段已在后台启动的任务
+            anvil_ready = context.metadata.pop("anvil_ready", None)
+            start_result = await (anvil_ready or anvil_tool(action="start"))
             results["start"] = start_result.to_dict()
 
         # 2. 模拟交易
-        if self.has_toolkit("anvil_simulator"):
-            anvil_tool = self.get_toolkit("anvil_simulator")
-            assert anvil_tool is not None
+        if anvil_tool is not None:
             sim_result = await anvil_tool(
-                action="simulate_tx", user_intent=context.user_intent, **params
-            )
-            results["simulation"] = sim_result.to_dict()
-            context.simulation_result = sim_result.to_dict()
-
-        # 3. 分析trace
-        if results["simulation"].get("success") and self.has_toolkit("forensics_analyzer"):
-            forensics_tool = self.get_toolkit("forensics_analyzer")
-            assert forensics_tool is not None
-            trace_result = await forensics_tool(
-                action="analyze_trace",
-                call_traces=results["simulation"]["data"].get("call_traces", []),
-                tx_from=params.get("tx_from"),
-                tx_to=params.get("tx_to"),
-                tx_value=params.get("tx_value", "0"),
-            )
-            results["trace_analysis"] = trace_result.to_dict()
-
-        # 4. 检测攻击
-        if results["simulation"].get("success") and self.has_toolkit("forensics_analyzer"):
-            forensics_tool = self.get_toolkit("forensics_analyzer")
-            assert forensics_tool is not None
-            attack_result = await forensics_tool(
-                action="detect_attack",
-                call_traces=results["simulation"]["data"].get("call_traces", []),
-                asset_changes=results["simulation"]["data"].get("asset_changes", []),
+                action="simulate_tx",
                 user_intent=context.user_intent,
+                **self._apply_retry_strategy(context, params),
+            )
+            sim_dict = sim_result.to_dict()
+            results["simulation"] = sim_dict
+            self._record_simulation(context, sim_dict)
+
+        # 3. 分析trace / 4. 检测攻击：两者只依赖模拟结果，并发执行
+        if results["simulation"].get("success") and forensics_tool is not None:
+            sim_data = results["simulation"]["data"]
+            call_traces = sim_data.get("call_traces", [])
+            trace_result, attack_result = await asyncio.gather(
+                forensics_tool(
+                    action="analyze_trace",
+                    call_traces=call_traces,
+                    tx_from=params.get("tx_from"),
+                    tx_to=params.get("tx_to"),
+                    tx_value=params.get("tx_value", "0"),
+                ),
+                forensics_tool(
+                    action="detect_attack",
+                    call_traces=call_traces,
+                    asset_changes=sim_data.get("asset_changes", []),
+                    user_intent=context.user_intent,
+                ),
+                return_exceptions=True,
             )
-            results["attack_detection"] = attack_result.to_dict()
+            for key, result in (
+                ("trace_analysis", trace_result),
+                ("attack_detection", attack_result),
+            ):
+                if isinstance(result, Exception):
+                    results[key] = {"success": False, "error": str(result)}
+                else:
+                    results[key] = result.to_dict()
 
         return AgentResult(
             agent_name=self.agent_name,
@@ -122,29 +131,54 @@ class ExecutorAgent(BaseAgent):
         tasks = plan["execution_plan"]["tasks"]
         parallel_groups = plan["execution_plan"].get("parallel_groups", [])
 
+        # 单任务计划：直接执行，跳过分组调度和汇总统计（此时并行组只含这一个任务）
+        if len(tasks) == 1:
+            task = tasks[0]
+            result = await self._execute_task(context, task, results)
+            if task["id"] == "simulate_tx":
+                self._record_simulation(context, result)
+            success = bool(result.get("success", False))
+            return AgentResult(
+                agent_name=self.agent_name,
+                success=success,
+                execution_time=0.0,
+                data={task["id"]: result},
+                error=None,
+                next_step="reflection" if success else "aggregator",
+                confidence=1.0 if success else 0.0,
+            )
+
+        success_count = 0
+
         # 如果有并行组，按组执行
         if parallel_groups:
+            task_map = {t["id"]: t for t in tasks}
             for group in parallel_groups:
-                group_results = await self._execute_parallel(context, tasks, group)
+                group_results, group_success = await self._execute_parallel(
+                    context, task_map, group
+                )
                 results.update(group_results)
+                success_count += group_success
         else:
             # 顺序执行
             for task in tasks:
                 result = await self._execute_task(context, task, results)
                 results[task["id"]] = result
+                if result.get("success", False):
+                    success_count += 1
 
                 # 如果关键任务失败，停止执行
                 if task["priority"] == "critical" and not result.get("success"):
-                    logger.error(f"关键任务 {task['id']} 失败，停止执行")
+                    logger.error("关键任务 %s 失败，停止执行", task["id"])
                     break
 
         # 保存结果到上下文
         if "simulate_tx" in results:
-            context.simulation_result = results["simulate_tx"]
+            self._record_simulation(context, results["simulate_tx"])
 
         # 检查整体成功率
-        success_count = sum(1 for r in results.values() if r.get("success", False))
-        overall_success = success_count > len(results) / 2
+        result_count = len(results)
+        overall_success = success_count * 2 > result_count
 
         return AgentResult(
             agent_name=self.agent_name,
@@ -153,15 +187,13 @@ class ExecutorAgent(BaseAgent):
             data=results,
             error=None,
             next_step="reflection" if overall_success else "aggregator",
-            confidence=success_count / len(results) if results else 0.0,
+            confidence=success_count / result_count if result_count else 0.0,
         )
 
     async def _execute_parallel(
-        self, context: AgentContext, all_tasks: list[dict], task_ids: list[str]
-    ) -> dict[str, Any]:
-        """并行执行一组任务"""
-        task_map = {t["id"]: t for t in all_tasks}
-
+        self, context: AgentContext, task_map: dict[str, dict], task_ids: list[str]
+    ) -> tuple[dict[str, Any], int]:
+        """并行执行一组任务，返回 (结果, 成功任务数)"""
         # 创建协程
         coroutines = [self._execute_task(context, task_map[task_id], {}) for task_id in task_ids]
 
@@ -170,13 +202,51 @@ class ExecutorAgent(BaseAgent):
 
         # 组装结果
         results = {}
+        success_count = 0
         for task_id, result in zip(task_ids, results_list):
             if isinstance(result, Exception):
                 results[task_id] = {"success": False, "error": str(result)}
             else:
                 results[task_id] = result
+                if result.get("success", False):
+                    success_count += 1
+
+        return results, success_count
 
-        return results
+    def _apply_retry_strategy(
+        self, context: AgentContext, params: dict[str, Any]
+    ) -> dict[str, Any]:
+        """按Reflection给出的重试策略（metadata["retry_strategy"]）调整simulate_tx参数"""
+        strategy = context.metadata.get("retry_strategy")
+        if not strategy:
+            return params
+
+        strategy_type = strategy.get("type")
+        strategy_params = strategy.get("params", {})
+        if strategy_type == "increase_timeout":
+            anvil_tool = self.get_toolkit("anvil_simulator")
+            timeout = params.get("timeout") or getattr(anvil_tool, "timeout", 30)
+            multiplier = strategy_params.get("timeout_multiplier", 2)
+            return {**params, "timeout": timeout * multiplier}
+        if strategy_type == "state_override":
+            return {**params, "state_overrides": list(strategy_params.get("strategies", ()))}
+        return params
+
+    def _record_simulation(self, context: AgentContext, result: dict[str, Any]) -> None:
+        """
+        保存模拟结果
+
+        状态覆盖（如补足余额）改变了链上状态，重跑结果不能代表交易的真实执行，
+        只记入 metadata["override_simulation"] 供诊断，原始模拟结果仍作为评估依据。
+        """
+        strategy = context.metadata.get("retry_strategy") or {}
+        if strategy.get("type") == "state_override":
+            context.metadata["override_simulation"] = {
+                "state_overrides": list(strategy.get("params", {}).get("strategies", ())),
+                "result": result,
+            }
+        else:
+            context.simulation_result = result
 
     async def _execute_task(
         self, context: AgentContext, task: dict[str, Any], previous_results: dict[str, Any]
@@ -199,12 +269,19 @@ class ExecutorAgent(BaseAgent):
                 "task_id": task["id"],
             }
 
-        # 执行工具
+        if tool_name == "anvil_simulator" and action == "simulate_tx":
+            params = self._apply_retry_strategy(context, params)
+
+        # 执行工具；Anvil启动任务直接等待Perception阶段已在后台启动的任务，
+        # 同组的其他任务（如静态分析）与Anvil启动重叠执行
+        anvil_ready = None
+        if tool_name == "anvil_simulator" and action == "start":
+            anvil_ready = context.metadata.pop("anvil_ready", None)
         try:
-            result = await tool(action=action, **params)
+            result = await (anvil_ready or tool(action=action, **params))
             return result.to_dict()
         except Exception as e:
-            logger.error(f"任务 {task['id']} 执行失败: {e}")
+            logger.error("任务 %s 执行失败: %s", task["id"], e)
             return {
                 "success": False,
                 "error": str(e),
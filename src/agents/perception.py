@@ -4,13 +4,95 @@ Perception Agent - 感知层Agent
 负责解析用户输入、验证数据格式、提取关键信息。
 """
 
+import asyncio
 import logging
+import re
+from decimal import Decimal
+from functools import lru_cache
 from typing import Any
 
 from .base import AgentContext, AgentResult, BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# 意图关键词，一次扫描匹配全部关键词；仅按 ASCII 忽略大小写，命中结果小写后必在映射表中
+_INTENT_RE = re.compile(
+    r"(swap|exchange|approve|authorize|transfer|send|mint|stake|deposit|claim)",
+    re.IGNORECASE | re.ASCII,
+)
+
+# 关键词 -> 意图类型
+_KEYWORD_MAP: dict[str, str] = {
+    "swap": "swap",
+    "exchange": "swap",
+    "approve": "approve",
+    "authorize": "approve",
+    "transfer": "transfer",
+    "send": "transfer",
+    "mint": "mint",
+    "stake": "stake",
+    "deposit": "stake",
+    "claim": "claim",
+}
+
+# 同时出现多个关键词时取优先级最高（数值最小）的意图类型
+_INTENT_PRIORITY: dict[str, int] = {
+    "swap": 0,
+    "approve": 1,
+    "transfer": 2,
+    "mint": 3,
+    "stake": 4,
+    "claim": 5,
+}
+
+# 金额与滑点
+_AMOUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:eth|usdc|usdt|dai|wbtc)?", re.IGNORECASE)
+_SLIPPAGE_RE = re.compile(r"(?:slippage|slip)\s*(?:of\s*)?(\d+(?:\.\d+)?)%?", re.IGNORECASE)
+
+# 1 ETH = 10**18 wei
+_WEI_PER_ETH = 10**18
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _normalize_value(value: int | float | str) -> str:
+    """规范化value值为十六进制字符串（"0", 0, "0x0" 等常见输入直接命中缓存）"""
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, float):
+        # 假设是以ETH为单位，按十进制精确转换为wei，避免 value * 1e18 的浮点误差
+        return hex(int(Decimal(repr(value)) * _WEI_PER_ETH))
+    if value.startswith("0x"):
+        return value
+    try:
+        # 尝试转换为整数
+        return hex(int(value))
+    except ValueError:
+        return "0"
+
+
+@lru_cache(maxsize=2048)
+def _parse_intent(intent: str) -> tuple[str, tuple[str, ...], float | None]:
+    """解析意图类型、金额和滑点，返回不可变结果以便缓存重复出现的意图"""
+    # 意图分类：忽略大小写直接扫描原始输入，只对命中的关键词做小写转换
+    keywords = _INTENT_RE.findall(intent)
+    if not keywords:
+        intent_type = "unknown"
+    elif len(keywords) == 1:
+        intent_type = _KEYWORD_MAP[keywords[0].lower()]
+    else:
+        intent_type = min(
+            (_KEYWORD_MAP[k.lower()] for k in keywords), key=_INTENT_PRIORITY.__getitem__
+        )
+
+    # 提取金额
+    amounts = tuple(_AMOUNT_RE.findall(intent))
+
+    # 提取滑点容忍度
+    slippage_match = _SLIPPAGE_RE.search(intent)
+    slippage = float(slippage_match.group(1)) / 100 if slippage_match else None
+
+    return intent_type, amounts, slippage
+
 
 class PerceptionAgent(BaseAgent):
     """
@@ -38,16 +120,16 @@ class PerceptionAgent(BaseAgent):
         """
         try:
             # 1. 解析用户意图
-            intent_analysis = await self._parse_user_intent(context.user_intent)
+            intent_analysis = self._parse_user_intent(context.user_intent)
 
             # 2. 验证和规范化交易数据
-            tx_data = await self._validate_tx_data(context.tx_data)
+            tx_data = self._validate_tx_data(context.tx_data)
 
             # 3. 提取关键参数
-            key_params = await self._extract_key_params(context.user_intent, tx_data)
+            key_params = self._extract_key_params(context.user_intent, tx_data)
 
             # 4. 确定任务类型和复杂度
-            task_type, complexity = await self._classify_task(context, key_params)
+            task_type, complexity = self._classify_task(context, key_params)
 
             # 5. 构建结果
             result_data = {
@@ -63,6 +145,9 @@ class PerceptionAgent(BaseAgent):
             # 更新上下文
             context.metadata.update(result_data)
 
+            # 6. 输入有效，后台启动Anvil，与任务规划重叠
+            self._prestart_anvil(context)
+
             return AgentResult(
                 agent_name=self.agent_name,
                 success=True,
@@ -74,7 +159,7 @@ class PerceptionAgent(BaseAgent):
             )
 
         except Exception as e:
-            logger.error(f"Perception Agent执行失败: {e}", exc_info=True)
+            logger.error("Perception Agent执行失败: %s", e, exc_info=True)
             return AgentResult(
                 agent_name=self.agent_name,
                 success=False,
@@ -84,7 +169,17 @@ class PerceptionAgent(BaseAgent):
                 confidence=0.0,
             )
 
-    async def _parse_user_intent(self, intent: str) -> dict[str, Any]:
+    def _prestart_anvil(self, context: AgentContext) -> None:
+        """
+        在后台启动Anvil节点，Executor通过 metadata["anvil_ready"] 等待其就绪
+
+        节点的阻塞启动由AnvilToolkit放到线程中执行，不占用事件循环。
+        """
+        anvil_tool = self.get_toolkit("anvil_simulator")
+        if anvil_tool is not None and "anvil_ready" not in context.metadata:
+            context.metadata["anvil_ready"] = asyncio.create_task(anvil_tool(action="start"))
+
+    def _parse_user_intent(self, intent: str) -> dict[str, Any]:
         """
         解析用户意图
 
@@ -94,42 +189,16 @@ class PerceptionAgent(BaseAgent):
         Returns:
             解析后的意图结构化数据
         """
-        intent_lower = intent.lower()
-
-        # 意图分类
-        intent_type = "unknown"
-        if "swap" in intent_lower or "exchange" in intent_lower:
-            intent_type = "swap"
-        elif "approve" in intent_lower or "authorize" in intent_lower:
-            intent_type = "approve"
-        elif "transfer" in intent_lower or "send" in intent_lower:
-            intent_type = "transfer"
-        elif "mint" in intent_lower:
-            intent_type = "mint"
-        elif "stake" in intent_lower or "deposit" in intent_lower:
-            intent_type = "stake"
-        elif "claim" in intent_lower:
-            intent_type = "claim"
-
-        # 提取金额
-        import re
-
-        amount_pattern = r"(\d+(?:\.\d+)?)\s*(?:eth|usdc|usdt|dai|wbtc)?"
-        amounts = re.findall(amount_pattern, intent_lower, re.IGNORECASE)
-
-        # 提取滑点容忍度
-        slippage_pattern = r"(?:slippage|slip)\s*(?:of\s*)?(\d+(?:\.\d+)?)%?"
-        slippage_match = re.search(slippage_pattern, intent_lower)
-        slippage = float(slippage_match.group(1)) / 100 if slippage_match else None
+        intent_type, amounts, slippage = _parse_intent(intent)
 
         return {
             "intent_type": intent_type,
-            "amounts": amounts,
+            "amounts": list(amounts),
             "slippage_tolerance": slippage,
             "raw_intent": intent,
         }
 
-    async def _validate_tx_data(self, tx_data: dict[str, Any]) -> dict[str, Any]:
+    def _validate_tx_data(self, tx_data: dict[str, Any]) -> dict[str, Any]:
         """
         验证交易数据
 
@@ -147,10 +216,10 @@ class PerceptionAgent(BaseAgent):
                 address = tx_data[key]
                 if not isinstance(address, str):
                     raise ValueError(f"{key} 必须是字符串")
-                if not address.startswith("0x") or len(address) != 42:
+                if len(address) != 42 or not address.startswith("0x"):
                     raise ValueError(f"{key} 地址格式无效")
-                # 标准化地址
-                validated[key] = address.lower()
+                # 标准化地址：已是小写时直接复用，避免复制字符串
+                validated[key] = address if address.islower() else address.lower()
 
         # 验证并转换value
         for key in ["tx_value", "value", "amount"]:
@@ -170,27 +239,22 @@ class PerceptionAgent(BaseAgent):
         validated.setdefault("tx_value", "0")
         validated.setdefault("tx_data", "0x")
 
+        # 数值特征只解析一次，下游直接读取
+        try:
+            validated["tx_value_int"] = int(validated["tx_value"], 16)
+        except ValueError:
+            validated["tx_value_int"] = 0
+        validated["calldata_len"] = len(validated["tx_data"])
+
         return validated
 
     def _normalize_value(self, value: Any) -> str:
         """规范化value值"""
-        if isinstance(value, int):
-            return hex(value)
-        if isinstance(value, float):
-            # 假设是以ETH为单位，转换为wei
-            wei = int(value * 1e18)
-            return hex(wei)
-        if isinstance(value, str):
-            if value.startswith("0x"):
-                return value
-            try:
-                # 尝试转换为整数
-                return hex(int(value))
-            except ValueError:
-                return "0"
+        if isinstance(value, (int, float, str)):
+            return _normalize_value(value)
         return "0"
 
-    async def _extract_key_params(self, intent: str, tx_data: dict[str, Any]) -> dict[str, Any]:
+    def _extract_key_params(self, intent: str, tx_data: dict[str, Any]) -> dict[str, Any]:
         """提取关键参数"""
         return {
             "chain_id": tx_data.get("chain_id", 1),
@@ -201,9 +265,7 @@ class PerceptionAgent(BaseAgent):
             "gas_limit": tx_data.get("gas_limit", 30_000_000),
         }
 
-    async def _classify_task(
-        self, context: AgentContext, params: dict[str, Any]
-    ) -> tuple[str, str]:
+    def _classify_task(self, context: AgentContext, params: dict[str, Any]) -> tuple[str, str]:
         """
         分类任务类型和复杂度
 
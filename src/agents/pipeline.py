@@ -4,7 +4,12 @@ SSSEA Pipeline - ROMA Agent Pipeline
 完整的Agent执行流程，协调各个Agent的调用。
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+from collections.abc import AsyncIterator, Mapping
+from types import SimpleNamespace
 from typing import Any
 
 from ..toolkits.base import ToolkitRegistry
@@ -17,6 +22,22 @@ from .reflection import ReflectionAgent
 
 logger = logging.getLogger(__name__)
 
+# 按配置指纹缓存的Pipeline实例
+_PIPELINE_CACHE: dict[str, "SSSEAPipeline"] = {}
+
+
+def _json_default(obj: Any) -> Any:
+    """配置中的只读Mapping（如ROMAConfig.DEFAULTS子树）按dict序列化"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+def _config_fingerprint(config: Mapping[str, Any]) -> str:
+    """计算配置的稳定指纹"""
+    payload = json.dumps(config, sort_keys=True, default=_json_default)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
 
 class SSSEAPipeline:
     """
@@ -28,6 +49,8 @@ class SSSEAPipeline:
     支持简单任务的快速路径和复杂任务的完整分析。
     """
 
+    _AGENT_NAMES = ("perception", "planner", "executor", "reflection", "aggregator")
+
     def __init__(self, config: dict[str, Any] | None = None):
         """
         初始化Pipeline
@@ -40,6 +63,26 @@ class SSSEAPipeline:
         self._initialize_toolkits()
         self._initialize_agents()
 
+    @classmethod
+    def get_or_create(cls, config: dict[str, Any] | None = None) -> "SSSEAPipeline":
+        """
+        获取与配置对应的Pipeline实例
+
+        相同配置复用同一实例，toolkit与Agent只构建一次，Anvil/TEE在多次run()之间保持运行。
+
+        Args:
+            config: Pipeline配置
+
+        Returns:
+            SSSEAPipeline实例
+        """
+        key = _config_fingerprint(config or {})
+        pipeline = _PIPELINE_CACHE.get(key)
+        if pipeline is None:
+            pipeline = cls(config)
+            _PIPELINE_CACHE[key] = pipeline
+        return pipeline
+
     def _initialize_toolkits(self) -> None:
         """初始化工具集"""
         from ..toolkits import AnvilToolkit, ForensicsToolkit, TEEToolkit
@@ -50,19 +93,26 @@ class SSSEAPipeline:
         forensics_config = self.config.get("forensics", {})
 
         # 注册toolkit
-        self.toolkit_registry.register(AnvilToolkit(anvil_config))
-        self.toolkit_registry.register(TEEToolkit(tee_config))
-        self.toolkit_registry.register(ForensicsToolkit(forensics_config))
+        anvil = AnvilToolkit(anvil_config)
+        tee = TEEToolkit(tee_config)
+        forensics = ForensicsToolkit(forensics_config)
+        self.toolkit_registry.register(anvil)
+        self.toolkit_registry.register(tee)
+        self.toolkit_registry.register(forensics)
+
+        # Agent按属性访问工具，避免每次分发都做字符串哈希查找
+        self.anvil = anvil
+        self.tee = tee
+        self.forensics = forensics
+        self._toolkits_ns = SimpleNamespace(
+            anvil_simulator=anvil, tee_manager=tee, forensics_analyzer=forensics
+        )
 
-        logger.info(f"已注册 {len(self.toolkit_registry.list_tools())} 个工具")
+        logger.info("已注册 %d 个工具", len(self.toolkit_registry))
 
     def _initialize_agents(self) -> None:
         """初始化Agent"""
-        toolkits = {
-            "anvil_simulator": self.toolkit_registry.get("anvil_simulator"),
-            "tee_manager": self.toolkit_registry.get("tee_manager"),
-            "forensics_analyzer": self.toolkit_registry.get("forensics_analyzer"),
-        }
+        toolkits = self._toolkits_ns
 
         self.perception = PerceptionAgent(self.config.get("perception", {}), toolkits)
         self.planner = PlannerAgent(self.config.get("planner", {}), toolkits)
@@ -87,6 +137,28 @@ class SSSEAPipeline:
         Returns:
             完整的分析报告
         """
+        report: dict[str, Any] = {}
+        async for event in self.run_stream(user_intent, tx_data, metadata):
+            if event["stage"] == "done":
+                report = event["report"]
+        return report
+
+    async def run_stream(
+        self,
+        user_intent: str,
+        tx_data: dict[str, Any] | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        运行完整的分析流程，每完成一个阶段产出一个事件
+
+        事件格式为 {"stage": 阶段名}；最后一个事件为 {"stage": "done", "report": 分析报告}。
+
+        Args:
+            user_intent: 用户意图
+            tx_data: 交易数据
+            metadata: 额外的元数据
+        """
         # 创建上下文
         context = AgentContext(
             user_intent=user_intent,
@@ -100,54 +172,72 @@ class SSSEAPipeline:
             perception_result = await self.perception(context)
             if not perception_result.success:
                 error_msg = perception_result.error or "Unknown error"
-                return self._error_report(context, "perception", error_msg)
+                report = self._error_report(context, "perception", error_msg)
+                yield {"stage": "done", "report": report}
+                return
+            yield {"stage": "perception"}
 
             # 2. 根据复杂度决定是否需要Planner
             if perception_result.next_step == "planner":
                 planner_result = await self.planner(context)
                 if not planner_result.success:
                     error_msg = planner_result.error or "Unknown error"
-                    return self._error_report(context, "planner", error_msg)
+                    report = self._error_report(context, "planner", error_msg)
+                    yield {"stage": "done", "report": report}
+                    return
+                yield {"stage": "planner"}
 
             # 3. Executor: 执行分析
             executor_result = await self.executor(context)
             if not executor_result.success and not executor_result.data:
                 error_msg = executor_result.error or "Unknown error"
-                return self._error_report(context, "executor", error_msg)
+                report = self._error_report(context, "executor", error_msg)
+                yield {"stage": "done", "report": report}
+                return
+            yield {"stage": "executor"}
 
             # 4. Reflection: 分析结果
             reflection_result = await self.reflection(context)
+            yield {"stage": "reflection"}
 
-            # 5. 根据反思结果决定是否重试
+            # 5. 根据反思结果决定是否重试：Executor按策略调整模拟参数（超时、状态覆盖）后重跑；
+            #    状态覆盖重跑的结果只作诊断证据，不替换原始模拟结果
             if reflection_result.next_step == "executor":
-                logger.info("根据反思结果，重新执行...")
+                retry_decision = reflection_result.data.get("retry_decision") or {}
+                strategy = retry_decision.get("retry_strategy") or {}
+                logger.info("根据反思结果，按策略 %s 重新执行...", strategy.get("type"))
+                context.metadata["retry_strategy"] = strategy
                 executor_result = await self.executor(context)
+                yield {"stage": "executor"}
                 reflection_result = await self.reflection(context)
+                yield {"stage": "reflection"}
 
             # 6. Aggregator: 聚合最终结果
             aggregator_result = await self.aggregator(context)
 
-            return aggregator_result.data
+            yield {"stage": "done", "report": aggregator_result.data}
 
         except Exception as e:
-            logger.error(f"Pipeline执行失败: {e}", exc_info=True)
-            return self._error_report(context, "pipeline", str(e))
+            logger.error("Pipeline执行失败: %s", e, exc_info=True)
+            yield {"stage": "done", "report": self._error_report(context, "pipeline", str(e))}
 
         finally:
-            # 清理资源
-            await self._cleanup()
+            # 等待未被Executor消费的后台Anvil启动任务结束，避免任务悬挂
+            anvil_ready = context.metadata.pop("anvil_ready", None)
+            if anvil_ready is not None:
+                await asyncio.gather(anvil_ready, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """停止Anvil并销毁TEE，在进程退出时调用"""
+        await self._cleanup()
 
     async def _cleanup(self) -> None:
         """清理资源"""
         # 停止Anvil
-        anvil = self.toolkit_registry.get("anvil_simulator")
-        if anvil:
-            await anvil.cleanup()
+        await self.anvil.cleanup()
 
         # 销毁TEE
-        tee = self.toolkit_registry.get("tee_manager")
-        if tee:
-            await tee.cleanup()
+        await self.tee.cleanup()
 
     def _error_report(self, context: AgentContext, stage: str, error: str) -> dict[str, Any]:
         """生成错误报告"""
@@ -183,5 +273,13 @@ class SSSEAPipeline:
         return {
             "status": "healthy",
             "toolkits": self.toolkit_registry.list_tools(),
-            "agents": ["perception", "planner", "executor", "reflection", "aggregator"],
+            "agents": self._AGENT_NAMES,
         }
+
+
+async def shutdown_pipelines() -> None:
+    """关闭所有缓存的Pipeline实例"""
+    pipelines = list(_PIPELINE_CACHE.values())
+    _PIPELINE_CACHE.clear()
+    for pipeline in pipelines:
+        await pipeline.shutdown()
@@ -5,6 +5,8 @@ Planner Agent - 规划层Agent
 """
 
 import logging
+from collections import OrderedDict, defaultdict
+from types import MappingProxyType
 from typing import Any
 
 from .base import AgentContext, AgentResult, BaseAgent
@@ -12,6 +14,10 @@ from .base import AgentContext, AgentResult, BaseAgent
 logger = logging.getLogger(__name__)
 
 
+class CycleDetectedError(ValueError):
+    """子任务依赖图中存在环，无法生成执行顺序"""
+
+
 class PlannerAgent(BaseAgent):
     """
     规划层Agent
@@ -26,6 +32,18 @@ class PlannerAgent(BaseAgent):
     agent_name = "planner"
     description = "将复杂任务分解为可执行的子任务"
 
+    # 优先级数值
+    _PRIORITY_ORDER = {"critical": 3, "high": 2, "medium": 1, "low": 0}
+
+    # 计划缓存容量
+    PLAN_CACHE_MAX_SIZE = 256
+
+    def _initialize(self) -> None:
+        """初始化计划缓存"""
+        self._plan_cache_enabled = self.config.get("plan_cache_enabled", True)
+        # 任务特征 -> (任务ID顺序, 并行组)
+        self._plan_cache: OrderedDict[tuple, tuple[tuple[str, ...], tuple]] = OrderedDict()
+
     async def execute(self, context: AgentContext) -> AgentResult:
         """
         执行规划层分析
@@ -43,35 +61,29 @@ class PlannerAgent(BaseAgent):
             # 2. 生成子任务列表
             subtasks = await self._generate_subtasks(context, task_analysis)
 
-            # 3. 构建执行DAG
-            execution_plan = await self._build_execution_dag(subtasks)
+            # 3. 构建执行DAG（相同特征的任务复用已缓存的执行顺序）
+            execution_plan = await self._get_execution_plan(context, task_analysis, subtasks)
 
             # 4. 估算资源需求
             resource_estimate = await self._estimate_resources(execution_plan)
 
-            result_data = {
-                "task_analysis": task_analysis,
-                "subtasks": subtasks,
-                "execution_plan": execution_plan,
-                "resource_estimate": resource_estimate,
-                "estimated_steps": len(subtasks),
-            }
+            plan = self._freeze_plan(task_analysis, subtasks, execution_plan, resource_estimate)
 
-            # 更新上下文
-            context.metadata["plan"] = result_data
+            # 更新上下文；计划只读，下游Agent共享同一份对象
+            context.metadata["plan"] = plan
 
             return AgentResult(
                 agent_name=self.agent_name,
                 success=True,
                 execution_time=0.0,
-                data=result_data,
+                data=dict(plan),
                 error=None,
                 next_step="executor",
                 confidence=0.9,
             )
 
         except Exception as e:
-            logger.error(f"Planner Agent执行失败: {e}", exc_info=True)
+            logger.error("Planner Agent执行失败: %s", e, exc_info=True)
             return AgentResult(
                 agent_name=self.agent_name,
                 success=False,
@@ -81,16 +93,61 @@ class PlannerAgent(BaseAgent):
                 confidence=0.0,
             )
 
+    @staticmethod
+    def _freeze_plan(
+        task_analysis: dict[str, Any],
+        subtasks: list[dict[str, Any]],
+        execution_plan: dict[str, Any],
+        resource_estimate: dict[str, Any],
+    ) -> MappingProxyType:
+        """
+        冻结规划结果
+
+        子任务及其参数包装为只读映射，列表转为元组，下游修改会直接抛出TypeError，
+        而不是静默篡改计划。执行计划中的任务与 subtasks 引用同一批只读对象。
+        """
+        frozen_tasks = {}
+        for task in subtasks:
+            task = dict(task)
+            task["params"] = MappingProxyType(task["params"])
+            if "depends_on" in task:
+                task["depends_on"] = tuple(task["depends_on"])
+            frozen_tasks[task["id"]] = MappingProxyType(task)
+
+        return MappingProxyType(
+            {
+                "task_analysis": MappingProxyType(task_analysis),
+                "subtasks": tuple(frozen_tasks.values()),
+                "execution_plan": MappingProxyType(
+                    {
+                        "tasks": tuple(frozen_tasks[t["id"]] for t in execution_plan["tasks"]),
+                        "total": execution_plan["total"],
+                        "parallel_groups": tuple(
+                            tuple(group) for group in execution_plan["parallel_groups"]
+                        ),
+                    }
+                ),
+                "resource_estimate": MappingProxyType(
+                    {
+                        **resource_estimate,
+                        "required_tools": tuple(resource_estimate["required_tools"]),
+                    }
+                ),
+                "estimated_steps": len(subtasks),
+            }
+        )
+
     async def _analyze_task(self, context: AgentContext) -> dict[str, Any]:
         """分析任务特征"""
         tx_data = context.metadata.get("validated_tx_data", {})
         intent_analysis = context.metadata.get("intent_analysis", {})
 
+        calldata_size = tx_data.get("calldata_len", 2)
         analysis = {
             "task_type": intent_analysis.get("intent_type", "unknown"),
-            "has_value": int(tx_data.get("tx_value", "0"), 16) > 0,
-            "has_calldata": len(tx_data.get("tx_data", "0x")) > 2,
-            "calldata_size": len(tx_data.get("tx_data", "0x")),
+            "has_value": tx_data.get("tx_value_int", 0) > 0,
+            "has_calldata": calldata_size > 2,
+            "calldata_size": calldata_size,
             "target_contract": tx_data.get("tx_to", ""),
         }
 
@@ -104,6 +161,13 @@ class PlannerAgent(BaseAgent):
     ) -> list[dict[str, Any]]:
         """生成子任务列表"""
         subtasks = []
+        metadata = context.metadata
+        validated_tx = metadata.get("validated_tx_data") or {}
+        key_params = metadata.get("key_params") or {}
+
+        # 交易模拟参数：key_params 优先于 user_intent
+        sim_params = dict(key_params)
+        sim_params.setdefault("user_intent", context.user_intent)
 
         # 子任务1: 合约静态分析
         if analysis["has_calldata"]:
@@ -115,9 +179,7 @@ class PlannerAgent(BaseAgent):
                     "action": "check_risk_patterns",
                     "params": {
                         "tx_to": analysis["target_contract"],
-                        "tx_data": context.metadata.get("validated_tx_data", {}).get(
-                            "tx_data", "0x"
-                        ),
+                        "tx_data": validated_tx.get("tx_data", "0x"),
                     },
                     "priority": "high",
                 }
@@ -142,10 +204,7 @@ class PlannerAgent(BaseAgent):
                 "name": "执行交易模拟",
                 "tool": "anvil_simulator",
                 "action": "simulate_tx",
-                "params": {
-                    "user_intent": context.user_intent,
-                    **context.metadata.get("key_params", {}),
-                },
+                "params": sim_params,
                 "priority": "critical",
                 "depends_on": ["setup_environment"],
             }
@@ -159,9 +218,9 @@ class PlannerAgent(BaseAgent):
                 "tool": "forensics_analyzer",
                 "action": "analyze_trace",
                 "params": {
-                    "tx_from": context.metadata.get("key_params", {}).get("tx_from"),
-                    "tx_to": context.metadata.get("key_params", {}).get("tx_to"),
-                    "tx_value": context.metadata.get("key_params", {}).get("tx_value"),
+                    "tx_from": key_params.get("tx_from"),
+                    "tx_to": key_params.get("tx_to"),
+                    "tx_value": key_params.get("tx_value"),
                 },
                 "priority": "medium",
                 "depends_on": ["simulate_tx"],
@@ -183,58 +242,92 @@ class PlannerAgent(BaseAgent):
 
         return subtasks
 
-    async def _build_execution_dag(self, subtasks: list[dict[str, Any]]) -> dict[str, Any]:
-        """构建执行DAG"""
-        # 按依赖关系排序
-        ordered = []
-        remaining = subtasks.copy()
-        executed = set()
+    async def _get_execution_plan(
+        self,
+        context: AgentContext,
+        analysis: dict[str, Any],
+        subtasks: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """
+        获取执行计划
 
-        while remaining:
-            # 找到没有未完成依赖的任务
-            ready = [t for t in remaining if all(d in executed for d in t.get("depends_on", []))]
+        子任务的结构只取决于任务特征，缓存其拓扑顺序和并行组；
+        子任务本身每次重新生成，参数始终来自当前请求。
+        """
+        if not self._plan_cache_enabled:
+            return await self._plan_dag(subtasks)
+
+        cache_key = (
+            analysis["task_type"],
+            analysis["has_calldata"],
+            analysis["has_value"],
+            analysis["target_contract"],
+            tuple(sorted(context.metadata.get("key_params", {}))),
+        )
+        cached = self._plan_cache.get(cache_key)
+        if cached is not None:
+            self._plan_cache.move_to_end(cache_key)
+            order, groups = cached
+            by_id = {t["id"]: t for t in subtasks}
+            return {
+                "tasks": [by_id[task_id] for task_id in order],
+                "total": len(order),
+                "parallel_groups": [list(group) for group in groups],
+            }
+
+        plan = await self._plan_dag(subtasks)
+        self._plan_cache[cache_key] = (
+            tuple(t["id"] for t in plan["tasks"]),
+            tuple(tuple(group) for group in plan["parallel_groups"]),
+        )
+        if len(self._plan_cache) > self.PLAN_CACHE_MAX_SIZE:
+            self._plan_cache.popitem(last=False)
+        return plan
 
-            if not ready:
-                # 循环依赖或错误，按优先级取一个
-                ready = [max(remaining, key=lambda t: self._priority_value(t["priority"]))]
+    async def _plan_dag(self, subtasks: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        构建执行DAG
 
-            task = ready[0]
-            ordered.append(task)
-            executed.add(task["id"])
-            remaining.remove(task)
+        按层做Kahn拓扑排序：当前入度为0的任务构成一层，层内任务互不依赖，
+        直接作为一个并行组；层内按优先级、ID排序。
+        """
+        by_id = {t["id"]: t for t in subtasks}
+        dep_count: dict[str, int] = {}
+        children: defaultdict[str, list[str]] = defaultdict(list)
+        for task in subtasks:
+            depends_on = task.get("depends_on", ())
+            dep_count[task["id"]] = len(depends_on)
+            for dep in depends_on:
+                children[dep].append(task["id"])
+
+        ordered = []
+        parallel_groups = []
+        wave = sorted((t for t in subtasks if dep_count[t["id"]] == 0), key=self._task_order)
+        while wave:
+            ordered.extend(wave)
+            parallel_groups.append([t["id"] for t in wave])
+
+            next_wave = []
+            for task in wave:
+                for child in children.get(task["id"], ()):
+                    dep_count[child] -= 1
+                    if dep_count[child] == 0:
+                        next_wave.append(by_id[child])
+            wave = sorted(next_wave, key=self._task_order)
+
+        if len(ordered) < len(subtasks):
+            blocked = [task_id for task_id, count in dep_count.items() if count > 0]
+            raise CycleDetectedError(f"子任务存在循环依赖或依赖不存在: {blocked}")
 
         return {
             "tasks": ordered,
             "total": len(ordered),
-            "parallel_groups": self._group_parallel_tasks(ordered),
+            "parallel_groups": parallel_groups,
         }
 
-    def _group_parallel_tasks(self, tasks: list[dict]) -> list[list[str]]:
-        """将任务分组为可并行的组"""
-        groups = []
-        current_group = []
-        current_deps = set()
-
-        for task in tasks:
-            task_deps = set(task.get("depends_on", []))
-            # 如果当前任务依赖之前的任务，需要开始新组
-            if task_deps & current_deps:
-                groups.append([t["id"] for t in current_group])
-                current_group = [task]
-                current_deps = {task["id"]}
-            else:
-                current_group.append(task)
-                current_deps.add(task["id"])
-
-        if current_group:
-            groups.append([t["id"] for t in current_group])
-
-        return groups
-
-    def _priority_value(self, priority: str) -> int:
-        """获取优先级数值"""
-        order = {"critical": 3, "high": 2, "medium": 1, "low": 0}
-        return order.get(priority, 0)
+    def _task_order(self, task: dict[str, Any]) -> tuple[int, str]:
+        """同层任务的排序键：优先级高者在前，其次按ID"""
+        return -self._PRIORITY_ORDER.get(task["priority"], 0), task["id"]
 
     async def _estimate_resources(self, plan: dict[str, Any]) -> dict[str, Any]:
         """估算资源需求"""
@@ -4,13 +4,39 @@ Reflection Agent - 反思层Agent
 负责分析执行结果、决定是否需要重试或调整策略。
 """
 
+import asyncio
 import logging
+import re
+from enum import IntFlag
+from types import SimpleNamespace
 from typing import Any
 
 from .base import AgentContext, AgentResult, BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# 单笔资产转出超过该值（1 ETH，单位wei）视为异常
+_LARGE_OUTFLOW_WEI = 10**18
+
+
+class FailureFlag(IntFlag):
+    """质量评估发现的失败类型，按位组合"""
+
+    SIM_FAIL = 1  # 交易模拟失败
+    TIMEOUT = 2  # 模拟超时
+
+
+# 可重试的失败类型
+_RETRYABLE = FailureFlag.SIM_FAIL | FailureFlag.TIMEOUT
+
+
+# 意图关键词 -> 改进建议（按此顺序输出）
+_IMPROVEMENT_RULES: dict[str, tuple[str, ...]] = {
+    "swap": ("确认使用官方DEX合约", "检查滑点设置是否合理"),
+    "approve": ("验证授权额度是否合理", "确认授权目标合约可信"),
+}
+_IMPROVEMENT_RE = re.compile("|".join(_IMPROVEMENT_RULES), re.IGNORECASE)
+
 
 class ReflectionAgent(BaseAgent):
     """
@@ -28,7 +54,9 @@ class ReflectionAgent(BaseAgent):
     description = "分析结果并决定是否需要重试"
 
     def __init__(
-        self, config: dict[str, Any] | None = None, toolkits: dict[str, Any] | None = None
+        self,
+        config: dict[str, Any] | None = None,
+        toolkits: SimpleNamespace | dict[str, Any] | None = None,
     ):
         super().__init__(config, toolkits)
         self.max_retries = config.get("max_retries", 3) if config else 3
@@ -45,22 +73,37 @@ class ReflectionAgent(BaseAgent):
             AgentResult: 反思分析结果
         """
         try:
-            # 1. 分析执行结果
+            # 1. 分析执行结果 / 2. 检测异常
             quality_assessment = await self._assess_quality(context)
-
-            # 2. 检测异常
             anomalies = await self._detect_anomalies(context, quality_assessment)
 
-            # 3. 分析失败原因
-            failure_analysis = await self._analyze_failures(context, quality_assessment)
-
-            # 4. 决定是否需要重试
-            retry_decision = await self._make_retry_decision(
-                context, quality_assessment, failure_analysis
-            )
-
-            # 5. 生成改进建议
-            improvements = await self._generate_improvements(context, failure_analysis)
+            if (
+                quality_assessment["overall_success"]
+                and not quality_assessment["flags"]
+                and not anomalies
+            ):
+                # 快速路径：无问题无异常时没有失败可分析，直接交给Aggregator
+                failure_analysis = {
+                    "has_failures": False,
+                    "flags": FailureFlag(0),
+                    "failure_types": [],
+                    "remediation_steps": [],
+                }
+                retry_decision = {
+                    "should_retry": False,
+                    "retry_strategy": None,
+                    "next_step": "aggregator",
+                }
+                improvements = self._intent_improvements(context.user_intent)
+            else:
+                # 3. 分析失败原因
+                failure_analysis = await self._analyze_failures(context, quality_assessment)
+
+                # 4. 决定是否需要重试 / 5. 生成改进建议：两者只依赖失败分析，并发执行
+                retry_decision, improvements = await asyncio.gather(
+                    self._make_retry_decision(context, quality_assessment, failure_analysis),
+                    self._generate_improvements(context, failure_analysis),
+                )
 
             result_data = {
                 "quality_assessment": quality_assessment,
@@ -85,7 +128,7 @@ class ReflectionAgent(BaseAgent):
             )
 
         except Exception as e:
-            logger.error(f"Reflection Agent执行失败: {e}", exc_info=True)
+            logger.error("Reflection Agent执行失败: %s", e, exc_info=True)
             return AgentResult(
                 agent_name=self.agent_name,
                 success=False,
@@ -101,6 +144,7 @@ class ReflectionAgent(BaseAgent):
             "overall_success": True,
             "confidence": 0.7,
             "issues": [],
+            "flags": FailureFlag(0),
         }
 
         # 检查模拟结果
@@ -108,6 +152,7 @@ class ReflectionAgent(BaseAgent):
         if sim_result.get("success") is False:
             assessment["overall_success"] = False
             assessment["issues"].append("交易模拟失败")
+            assessment["flags"] |= FailureFlag.SIM_FAIL
             assessment["confidence"] = 0.3
 
         # 检查攻击检测结果
@@ -152,7 +197,7 @@ class ReflectionAgent(BaseAgent):
             asset_changes = sim_result.get("data", {}).get("asset_changes", [])
             for change in asset_changes:
                 amount = int(change.get("change", 0))
-                if amount < -int(1e18):  # 超过1 ETH转出
+                if amount < -_LARGE_OUTFLOW_WEI:  # 超过1 ETH转出
                     anomalies.append(
                         {
                             "type": "unexpected_outflow",
@@ -168,23 +213,20 @@ class ReflectionAgent(BaseAgent):
         self, context: AgentContext, quality: dict[str, Any]
     ) -> dict[str, Any]:
         """分析失败原因"""
+        flags = quality.get("flags", FailureFlag(0))
         analysis = {
-            "has_failures": False,
+            "has_failures": bool(flags),
+            "flags": flags,
             "failure_types": [],
             "remediation_steps": [],
         }
 
-        issues = quality.get("issues", [])
-        if issues:
-            analysis["has_failures"] = True
-
-            for issue in issues:
-                if "模拟失败" in issue:
-                    analysis["failure_types"].append("execution_error")
-                    analysis["remediation_steps"].append("检查交易参数和合约状态")
-                elif "超时" in issue:
-                    analysis["failure_types"].append("timeout")
-                    analysis["remediation_steps"].append("增加超时时间或优化模拟配置")
+        if flags & FailureFlag.SIM_FAIL:
+            analysis["failure_types"].append("execution_error")
+            analysis["remediation_steps"].append("检查交易参数和合约状态")
+        if flags & FailureFlag.TIMEOUT:
+            analysis["failure_types"].append("timeout")
+            analysis["remediation_steps"].append("增加超时时间或优化模拟配置")
 
         return analysis
 
@@ -203,33 +245,30 @@ class ReflectionAgent(BaseAgent):
             return decision
 
         # 如果有可重试的失败
-        if failure.get("has_failures") and self.retry_count < self.max_retries:
-            retryable_types = ["timeout", "execution_error"]
-            if any(t in retryable_types for t in failure.get("failure_types", [])):
-                decision["should_retry"] = True
-                decision["retry_strategy"] = self._select_retry_strategy(failure)
-                decision["next_step"] = "executor"
-                self.retry_count += 1
+        if self.retry_count < self.max_retries and failure.get("flags", 0) & _RETRYABLE:
+            decision["should_retry"] = True
+            decision["retry_strategy"] = self._select_retry_strategy(failure)
+            decision["next_step"] = "executor"
+            self.retry_count += 1
 
         return decision
 
     def _select_retry_strategy(self, failure: dict[str, Any]) -> dict[str, Any]:
         """选择重试策略"""
-        failure_types = failure.get("failure_types", [])
+        flags = failure.get("flags", FailureFlag(0))
 
-        if "timeout" in failure_types:
+        if flags & FailureFlag.TIMEOUT:
             return {
                 "type": "increase_timeout",
                 "params": {"timeout_multiplier": 2},
             }
-        elif "execution_error" in failure_types:
+        elif flags & FailureFlag.SIM_FAIL:
             return {
                 "type": "state_override",
                 "params": {
                     "strategies": [
                         "increase_balance",
                         "modify_timestamp",
-                        "adjust_gas_limit",
                     ]
                 },
             }
@@ -245,14 +284,18 @@ class ReflectionAgent(BaseAgent):
         if failure.get("has_failures"):
             improvements.extend(failure.get("remediation_steps", []))
 
-        # 基于用户意图的建议
-        intent_lower = context.user_intent.lower()
-        if "swap" in intent_lower:
-            improvements.append("确认使用官方DEX合约")
-            improvements.append("检查滑点设置是否合理")
+        improvements.extend(self._intent_improvements(context.user_intent))
+        return improvements
 
-        if "approve" in intent_lower:
-            improvements.append("验证授权额度是否合理")
-            improvements.append("确认授权目标合约可信")
+    @staticmethod
+    def _intent_improvements(user_intent: str) -> list[str]:
+        """基于用户意图的建议"""
+        matched = {m.group(0).lower() for m in _IMPROVEMENT_RE.finditer(user_intent)}
+        if not matched:
+            return []
 
+        improvements = []
+        for keyword, suggestions in _IMPROVEMENT_RULES.items():
+            if keyword in matched:
+                improvements.extend(suggestions)
         return improvements
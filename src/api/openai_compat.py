@@ -5,14 +5,23 @@ OpenAI Chat Completion Compatible API
 基于 ROMA Pipeline 进行完整的递归推理分析。
 """
 
-import json
+import asyncio
+import copy
+import hashlib
 import logging
+import os
+import threading
 import time
-import uuid
-from typing import Any
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, ClassVar, NotRequired, TypedDict
 
-from fastapi import HTTPException
-from pydantic import BaseModel
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ConfigDict, PrivateAttr, ValidationError, model_validator
 
 from ..attestation.mock_quote import generate_attestation_metadata
 from ..config import get_settings
@@ -20,23 +29,60 @@ from ..config import get_settings
 logger = logging.getLogger(__name__)
 
 
+# 随机字节池：每次从 os.urandom 取 4KiB，按需切片，避免每个 ID 一次 getrandom 系统调用
+_RAND_POOL_SIZE = 4096
+_rand_pool = b""
+_rand_pos = 0
+_rand_lock = threading.Lock()
+
+
+def _rid(n: int) -> str:
+    """生成 n 个十六进制字符的随机ID（n 为偶数）"""
+    global _rand_pool, _rand_pos
+    nbytes = n >> 1
+    with _rand_lock:
+        end = _rand_pos + nbytes
+        if end > len(_rand_pool):
+            _rand_pool = os.urandom(_RAND_POOL_SIZE)
+            end = nbytes
+        start, _rand_pos = end - nbytes, end
+        return _rand_pool[start:end].hex()
+
+
+# 秒级时间戳缓存，由 time_ticker 每 100ms 刷新；未运行时为 None
+_NOW_SEC: int | None = None
+
+
+def _now_s() -> int:
+    """当前 Unix 时间戳（秒）"""
+    return _NOW_SEC if _NOW_SEC is not None else int(time.time())
+
+
+async def time_ticker(interval: float = 0.1) -> None:
+    """后台刷新 _NOW_SEC，响应的 created 字段只需秒级精度"""
+    global _NOW_SEC
+    try:
+        while True:
+            _NOW_SEC = int(time.time())
+            await asyncio.sleep(interval)
+    finally:
+        _NOW_SEC = None
+
+
 # =============================================================================
 # OpenAI API Request/Response Models
 # =============================================================================
 
 
-class ChatMessage(BaseModel):
-    """Chat 消息"""
-
-    role: str
-    content: str
-    name: str | None = None
-    tool_calls: list[Any] | None = None
+# 请求/响应模型共用配置：忽略未知字段；实例解析后只读（私有属性除外）
+_MODEL_CONFIG = ConfigDict(extra="ignore", validate_assignment=False, frozen=True)
 
 
 class ToolFunction(BaseModel):
     """Tool 函数定义"""
 
+    model_config = _MODEL_CONFIG
+
     name: str
     arguments: str  # JSON string
 
@@ -44,14 +90,29 @@ class ToolFunction(BaseModel):
 class ToolCall(BaseModel):
     """Tool 调用"""
 
+    model_config = _MODEL_CONFIG
+
     id: str
     type: str = "function"
     function: ToolFunction
 
 
+class ChatMessage(BaseModel):
+    """Chat 消息"""
+
+    model_config = _MODEL_CONFIG
+
+    role: str
+    content: str
+    name: str | None = None
+    tool_calls: list[ToolCall] | None = None
+
+
 class Tool(BaseModel):
     """Tool 定义"""
 
+    model_config = _MODEL_CONFIG
+
     type: str = "function"
     function: dict[str, Any]
 
@@ -59,6 +120,8 @@ class Tool(BaseModel):
 class ToolChoice(BaseModel):
     """Tool 选择"""
 
+    model_config = _MODEL_CONFIG
+
     type: str = "function"
     function: dict[str, str]
 
@@ -66,6 +129,8 @@ class ToolChoice(BaseModel):
 class ChatCompletionRequest(BaseModel):
     """Chat Completion 请求"""
 
+    model_config = _MODEL_CONFIG
+
     model: str
     messages: list[ChatMessage]
     tools: list[Tool] | None = None
@@ -74,23 +139,70 @@ class ChatCompletionRequest(BaseModel):
     max_tokens: int | None = None
     stream: bool | None = False
 
+    # 解析时一次性确定是否声明了 simulate_tx 工具，分发时只需读取属性
+    _has_simulate_tx: bool = PrivateAttr(default=False)
+
+    @model_validator(mode="after")
+    def _detect_simulate_tx(self) -> "ChatCompletionRequest":
+        self._has_simulate_tx = bool(self.tools) and any(
+            t.function.get("name") == "simulate_tx" for t in self.tools
+        )
+        return self
+
+
+async def parse_chat_completion_request(request: Request) -> ChatCompletionRequest:
+    """
+    直接从原始请求体解析 ChatCompletionRequest
+
+    model_validate_json 在 pydantic-core 中一次完成 JSON 解码与校验，
+    省去先 json.loads 成字典再逐字段校验的两遍处理。
+    """
+    try:
+        return ChatCompletionRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False)) from e
+
 
 class Usage(BaseModel):
     """Token 使用统计"""
 
+    model_config = _MODEL_CONFIG
+
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
 
 
+class ChoiceMessage(BaseModel):
+    """响应中的助手消息"""
+
+    model_config = _MODEL_CONFIG
+
+    role: str = "assistant"
+    content: str
+    tool_calls: list[ToolCall] | None = None
+
+
+class Choice(BaseModel):
+    """响应候选项"""
+
+    model_config = _MODEL_CONFIG
+
+    index: int = 0
+    message: ChoiceMessage
+    finish_reason: str
+
+
 class ChatCompletionResponse(BaseModel):
     """Chat Completion 响应"""
 
+    model_config = _MODEL_CONFIG
+
     id: str
     object: str = "chat.completion"
     created: int
     model: str
-    choices: list[dict[str, Any]]
+    choices: list[Choice]
     usage: Usage
     system_fingerprint: str | None = None
 
@@ -98,60 +210,239 @@ class ChatCompletionResponse(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+# 出站响应只做序列化，不需要校验：处理器直接构建与上述模型同构的字典，
+# 上述响应模型仅用于 OpenAPI 文档
+class ToolCallDict(TypedDict):
+    """Tool 调用（响应）"""
+
+    id: str
+    type: str
+    function: dict[str, str]
+
+
+class ChoiceMessageDict(TypedDict):
+    """响应中的助手消息"""
+
+    role: str
+    content: str
+    # 只在有工具调用时出现，与 OpenAI 响应一致
+    tool_calls: NotRequired[list[ToolCallDict]]
+
+
+class ChoiceDict(TypedDict):
+    """响应候选项"""
+
+    index: int
+    message: ChoiceMessageDict
+    finish_reason: str
+
+
+class UsageDict(TypedDict):
+    """Token 使用统计"""
+
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class ChatCompletionDict(TypedDict):
+    """Chat Completion 响应"""
+
+    id: str
+    object: str
+    created: int
+    model: str
+    choices: list[ChoiceDict]
+    usage: UsageDict
+    system_fingerprint: str | None
+    metadata: dict[str, Any] | None
+
+
+def _completion_dict(
+    model: str,
+    content: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    tool_calls: list[ToolCallDict] | None = None,
+    system_fingerprint: str | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> ChatCompletionDict:
+    """构建 Chat Completion 响应字典"""
+    message: ChoiceMessageDict = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": f"chatcmpl-{_rid(28)}",
+        "object": "chat.completion",
+        "created": _now_s(),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+        "system_fingerprint": system_fingerprint,
+        "metadata": metadata,
+    }
+
+
 # =============================================================================
 # SSSEA Tool Definitions
 # =============================================================================
 
-SIMULATE_TX_TOOL = {
-    "type": "function",
-    "function": {
-        "name": "simulate_tx",
-        "description": (
-            "在 TEE 隔离沙盒中模拟 Web3 交易执行，并进行意图对齐审计。"
-            "返回详细的资产变动、风险评级和 OML 证明。"
-            "基于ROMA框架进行递归推理分析。"
+_P = MappingProxyType
+
+# 工具定义为深度只读常量（MappingProxyType/tuple），并预先序列化，/v1/tools 直接返回字节
+SIMULATE_TX_TOOL: MappingProxyType[str, Any] = _P(
+    {
+        "type": "function",
+        "function": _P(
+            {
+                "name": "simulate_tx",
+                "description": (
+                    "在 TEE 隔离沙盒中模拟 Web3 交易执行，并进行意图对齐审计。"
+                    "返回详细的资产变动、风险评级和 OML 证明。"
+                    "基于ROMA框架进行递归推理分析。"
+                ),
+                "parameters": _P(
+                    {
+                        "type": "object",
+                        "properties": _P(
+                            {
+                                "user_intent": _P(
+                                    {
+                                        "type": "string",
+                                        "description": (
+                                            "用户的自然语言意图，"
+                                            "如 'Swap 1 ETH to USDC, slippage 0.5%'"
+                                        ),
+                                    }
+                                ),
+                                "chain_id": _P(
+                                    {
+                                        "type": "integer",
+                                        "description": "链 ID，默认为以太坊主网 (1)",
+                                        "default": 1,
+                                    }
+                                ),
+                                "tx_from": _P({"type": "string", "description": "交易发起者地址"}),
+                                "tx_to": _P({"type": "string", "description": "交易目标地址"}),
+                                "tx_value": _P(
+                                    {
+                                        "type": "string",
+                                        "description": "交易 value（wei 格式）",
+                                        "default": "0",
+                                    }
+                                ),
+                                "tx_data": _P(
+                                    {
+                                        "type": "string",
+                                        "description": "交易 calldata",
+                                        "default": "0x",
+                                    }
+                                ),
+                            }
+                        ),
+                        "required": ("user_intent", "tx_from", "tx_to"),
+                    }
+                ),
+            }
         ),
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "user_intent": {
-                    "type": "string",
-                    "description": "用户的自然语言意图，如 'Swap 1 ETH to USDC, slippage 0.5%'",
-                },
-                "chain_id": {
-                    "type": "integer",
-                    "description": "链 ID，默认为以太坊主网 (1)",
-                    "default": 1,
-                },
-                "tx_from": {
-                    "type": "string",
-                    "description": "交易发起者地址",
-                },
-                "tx_to": {
-                    "type": "string",
-                    "description": "交易目标地址",
-                },
-                "tx_value": {
-                    "type": "string",
-                    "description": "交易 value（wei 格式）",
-                    "default": "0",
-                },
-                "tx_data": {
-                    "type": "string",
-                    "description": "交易 calldata",
-                    "default": "0x",
-                },
-            },
-            "required": ["user_intent", "tx_from", "tx_to"],
-        },
-    },
-}
+    }
+)
+del _P
+
+_SIMULATE_TX_TOOL_JSON = orjson.dumps(SIMULATE_TX_TOOL, default=dict)
+TOOLS_LIST_JSON = b'{"object":"list","data":[' + _SIMULATE_TX_TOOL_JSON + b"]}"
 
 
 # =============================================================================
 # API Handler
 # =============================================================================
 
+_CHAT_REPLY = (
+    "我是 SSSEA 安全审计 Agent，基于 ROMA 框架进行递归推理分析。"
+    "请使用 simulate_tx 工具来审计 Web3 交易。"
+)
+
+_SSE_DONE = b"data: [DONE]\n\n"
+
+# OML_ATTESTATION_ENABLED=false 时使用的固定证明字段，不再签名
+_ATTESTATION_DISABLED = MappingProxyType({"oml_attestation": "", "system_fingerprint": "disabled"})
+
+# Pipeline 失败时记录完整堆栈的最小间隔（秒）
+_TRACEBACK_LOG_INTERVAL = 60.0
+
+_RISK_EMOJI = MappingProxyType(
+    {
+        "SAFE": "✅",
+        "WARNING": "⚠️",
+        "CRITICAL": "🚨",
+    }
+)
+
+# 审计结果消息模板：固定部分一次格式化，列表部分按需拼接
+_RESULT_HEADER = (
+    "{emoji} **安全审计结果**: {risk_level}\n**置信度**: {confidence:.0%}\n\n**摘要**: {summary}"
+)
+_FINDINGS_HEADING = "\n\n**检测到的问题**:\n"
+_RECOMMENDATIONS_HEADING = "\n\n**建议**:\n"
+
+
+def _simulate_tool_call(tx_params: dict[str, Any]) -> ToolCallDict:
+    """构建 simulate_tx 工具调用"""
+    return {
+        "id": f"call_{_rid(24)}",
+        "type": "function",
+        "function": {
+            "name": "simulate_tx",
+            "arguments": orjson.dumps(tx_params).decode(),
+        },
+    }
+
+
+def _sse_chunk(
+    chunk_id: str,
+    created: int,
+    model: str,
+    delta: dict[str, Any],
+    finish_reason: str | None = None,
+    **extra: Any,
+) -> bytes:
+    """构建一条 chat.completion.chunk SSE 事件"""
+    payload = {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        **extra,
+    }
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+@lru_cache(maxsize=1024)
+def _parse_tool_arguments(raw: str) -> dict[str, Any]:
+    """解析工具调用参数；脚本化调用中相同的参数字符串经常重复出现"""
+    return orjson.loads(raw)
+
+
+def _find_simulate_call(message: ChatMessage) -> ToolCall | None:
+    """返回消息中的 simulate_tx 工具调用"""
+    tool_calls = message.tool_calls
+    if tool_calls:
+        for call in tool_calls:
+            if call.function.name == "simulate_tx":
+                return call
+    return None
+
 
 class SSSEAHandler:
     """
@@ -160,22 +451,43 @@ class SSSEAHandler:
     使用 ROMA Pipeline 进行完整的递归推理分析。
     """
 
+    # 进程内共享的 Pipeline，首次模拟请求时创建
+    _roma_pipeline: ClassVar[Any | None] = None
+    _pipeline_lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    # 进行中的 Pipeline 运行：请求特征 -> 运行任务
+    _inflight: ClassVar[dict[str, asyncio.Task]] = {}
+    # 分析结果缓存：请求摘要 -> (过期时间, Pipeline结果)，按最近使用排序
+    _response_cache: ClassVar[OrderedDict[str, tuple[float, dict[str, Any]]]] = OrderedDict()
+    # 上次记录 Pipeline 失败完整堆栈的时间（monotonic）
+    _last_traceback_at: ClassVar[float] = float("-inf")
+
     def __init__(self, settings: Any | None = None):
         self.settings = settings or get_settings()
-        self._roma_pipeline = None
-        self._initialize_pipeline()
 
-    def _initialize_pipeline(self) -> None:
+    async def get_pipeline(self) -> Any:
+        """获取 ROMA Pipeline，首次调用时加载配置并创建（双重检查加锁）"""
+        pipeline = SSSEAHandler._roma_pipeline
+        if pipeline is not None:
+            return pipeline
+
+        async with SSSEAHandler._pipeline_lock:
+            if SSSEAHandler._roma_pipeline is None:
+                SSSEAHandler._roma_pipeline = self._create_pipeline()
+            return SSSEAHandler._roma_pipeline
+
+    def _create_pipeline(self) -> Any:
         """初始化 ROMA Pipeline"""
         try:
+            from config.roma_config import load_profile
+
             from ..agents import SSSEAPipeline
-            from ..config.roma_config import load_profile
 
             # 根据环境加载配置
             profile = "dev" if self.settings.api_reload else "prod"
             config = load_profile(profile)
-            self._roma_pipeline = SSSEAPipeline(config)
+            pipeline = SSSEAPipeline.get_or_create(config)
             logger.info(f"ROMA Pipeline initialized with profile: {profile}")
+            return pipeline
 
         except ImportError as e:
             logger.error(f"Failed to import ROMA Pipeline: {e}")
@@ -187,7 +499,7 @@ class SSSEAHandler:
     async def handle_chat_completion(
         self,
         request: ChatCompletionRequest,
-    ) -> ChatCompletionResponse:
+    ) -> ChatCompletionDict:
         """
         处理 Chat Completion 请求
 
@@ -195,19 +507,64 @@ class SSSEAHandler:
             request: Chat Completion 请求
 
         Returns:
-            ChatCompletionResponse: 响应
+            ChatCompletionDict: 响应
         """
         # 检查是否请求了 simulate_tx 工具
-        if request.tools and any(t.function.get("name") == "simulate_tx" for t in request.tools):
+        if request._has_simulate_tx:
             return await self._handle_simulation(request)
 
         # 返回普通聊天响应
         return await self._handle_chat(request)
 
+    async def stream_chat_completion(self, request: ChatCompletionRequest) -> AsyncIterator[bytes]:
+        """
+        以 SSE 流式返回 Chat Completion（request.stream=True）
+
+        先发送角色与 tool_calls 增量，Pipeline 每完成一个阶段发送一条 SSE 注释，
+        最后发送审计结果内容、结束块和 [DONE]。
+        """
+        chunk_id = f"chatcmpl-{_rid(28)}"
+        created = _now_s()
+        model = request.model
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None, **extra: Any) -> bytes:
+            return _sse_chunk(chunk_id, created, model, delta, finish_reason, **extra)
+
+        yield chunk({"role": "assistant", "content": ""})
+
+        if not request._has_simulate_tx:
+            yield chunk({"content": _CHAT_REPLY})
+            yield chunk({}, "stop", system_fingerprint=f"sssea-roma@{_rid(8)}")
+            yield _SSE_DONE
+            return
+
+        try:
+            intent, tx_params = self._extract_transaction_params(request)
+            yield chunk({"tool_calls": [{"index": 0, **_simulate_tool_call(tx_params)}]})
+
+            pipeline = await self.get_pipeline()
+            result: dict[str, Any] = {}
+            async for event in pipeline.run_stream(user_intent=intent, tx_data=tx_params):
+                stage = event["stage"]
+                if stage == "done":
+                    result = event["report"]
+                else:
+                    yield f": {stage}\n\n".encode()
+
+            system_fingerprint, metadata = await self._attest_result(model, result)
+            yield chunk({"content": self._format_result_message(result)})
+            yield chunk({}, "tool_calls", system_fingerprint=system_fingerprint, metadata=metadata)
+        except Exception as e:
+            # 响应头已发送，无法再返回500，按 OpenAI 流式协议发送错误事件
+            logger.error("流式模拟执行失败: %s", e, exc_info=True)
+            error = {"error": {"message": f"模拟执行失败: {e}", "type": "server_error"}}
+            yield b"data: " + orjson.dumps(error) + b"\n\n"
+        yield _SSE_DONE
+
     async def _handle_simulation(
         self,
         request: ChatCompletionRequest,
-    ) -> ChatCompletionResponse:
+    ) -> ChatCompletionDict:
         """处理模拟请求"""
         # 1. 提取意图和交易数据
         intent, tx_params = self._extract_transaction_params(request)
@@ -220,149 +577,166 @@ class SSSEAHandler:
         request: ChatCompletionRequest,
         intent: str,
         tx_params: dict[str, Any],
-    ) -> ChatCompletionResponse:
+    ) -> ChatCompletionDict:
         """使用ROMA Pipeline处理请求"""
-        try:
-            # 运行ROMA Pipeline
-            if self._roma_pipeline is None:
-                raise RuntimeError("ROMA Pipeline is not initialized")
-            result = await self._roma_pipeline.run(
-                user_intent=intent,
-                tx_data=tx_params,
-            )
+        key = self._request_digest(request, intent, tx_params)
+        cache_enabled = self.settings.response_cache_size > 0
 
-            # 构建响应
-            return self._build_response(request, intent, tx_params, result)
+        try:
+            # 相同意图、交易和模型的重复请求直接复用缓存的分析结果
+            result = self._get_cached_result(key) if cache_enabled else None
+            if result is None:
+                # 运行ROMA Pipeline；摘要相同的并发请求合并为一次运行
+                task = SSSEAHandler._inflight.get(key)
+                if task is None:
+                    pipeline = await self.get_pipeline()
+                    task = asyncio.create_task(pipeline.run(user_intent=intent, tx_data=tx_params))
+                    SSSEAHandler._inflight[key] = task
+                    task.add_done_callback(lambda _t: SSSEAHandler._inflight.pop(key, None))
+                # shield：单个请求被取消时不影响其他等待同一结果的请求
+                result = await asyncio.shield(task)
+
+                # 只缓存成功的分析，失败报告应在下次请求时重新运行
+                if cache_enabled and result.get("success") is not False:
+                    self._cache_result(key, result)
+
+            # 每个响应单独构建：id、工具调用、system_fingerprint 与证明签名都重新生成
+            response = await self._build_response(request, intent, tx_params, result)
 
         except Exception as e:
-            logger.error(f"ROMA Pipeline执行失败: {e}", exc_info=True)
+            # 失败频繁时（如部署配置错误）每分钟最多记录一次完整堆栈
+            now = time.monotonic()
+            if now - SSSEAHandler._last_traceback_at >= _TRACEBACK_LOG_INTERVAL:
+                SSSEAHandler._last_traceback_at = now
+                logger.error("ROMA Pipeline执行失败: %s", e, exc_info=True)
+            else:
+                logger.warning("ROMA Pipeline执行失败: %r", e)
             raise HTTPException(status_code=500, detail=f"模拟执行失败: {str(e)}")
 
-    def _build_response(
+        return response
+
+    def _request_digest(
+        self, request: ChatCompletionRequest, intent: str, tx_params: dict[str, Any]
+    ) -> str:
+        """
+        请求摘要：意图、完整交易参数与模型的规范化 JSON 的 BLAKE2b 摘要
+
+        同时用作并发请求合并与响应缓存的键，两者对"相同请求"的判定保持一致。
+        """
+        canonical = orjson.dumps(
+            {"intent": intent, "tx_params": tx_params, "model": request.model},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+    def _get_cached_result(self, key: str) -> dict[str, Any] | None:
+        """读取未过期的缓存分析结果（只读，构建响应时不得修改）"""
+        cache = SSSEAHandler._response_cache
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return result
+
+    def _cache_result(self, key: str, result: dict[str, Any]) -> None:
+        """写入分析结果缓存，超出容量时淘汰最久未使用的条目"""
+        cache = SSSEAHandler._response_cache
+        cache[key] = (time.monotonic() + self.settings.response_cache_ttl_seconds, result)
+        cache.move_to_end(key)
+        while len(cache) > self.settings.response_cache_size:
+            cache.popitem(last=False)
+
+    async def _build_response(
         self,
         request: ChatCompletionRequest,
         intent: str,
         tx_params: dict[str, Any],
         result: dict[str, Any],
-    ) -> ChatCompletionResponse:
+    ) -> ChatCompletionDict:
         """构建响应"""
-        verdict = result.get("verdict", {})
-        tool_call_id = f"call_{uuid.uuid4().hex[:24]}"
-
         # 格式化响应消息
         content = self._format_result_message(result)
-
-        # 生成证明
-        attestation = generate_attestation_metadata(
-            simulation_result={
-                "risk_level": verdict.get("risk_level", "UNKNOWN"),
-                "confidence": verdict.get("confidence", 0.7),
-            },
-            model_name=request.model,
+        system_fingerprint, metadata = await self._attest_result(request.model, result)
+
+        return _completion_dict(
+            request.model,
+            content,
+            prompt_tokens=100,
+            completion_tokens=len(content) >> 2,
+            tool_calls=[_simulate_tool_call(tx_params)],
+            system_fingerprint=system_fingerprint,
+            metadata=metadata,
         )
 
-        return ChatCompletionResponse(
-            id=f"chatcmpl-{uuid.uuid4().hex[:28]}",
-            created=int(time.time()),
-            model=request.model,
-            choices=[
-                {
-                    "index": 0,
-                    "message": {
-                        "role": "assistant",
-                        "content": content,
-                        "tool_calls": [
-                            {
-                                "id": tool_call_id,
-                                "type": "function",
-                                "function": {
-                                    "name": "simulate_tx",
-                                    "arguments": json.dumps(tx_params),
-                                },
-                            }
-                        ],
-                    },
-                    "finish_reason": "tool_calls",
-                }
-            ],
-            usage=Usage(
-                prompt_tokens=100,
-                completion_tokens=len(content) // 4,
-                total_tokens=100 + len(content) // 4,
-            ),
-            system_fingerprint=attestation["system_fingerprint"],
-            metadata={
-                "oml_attestation": attestation["oml_attestation"],
-                "risk_level": verdict.get("risk_level", "UNKNOWN"),
-                "risk_score": int(verdict.get("confidence", 0.7) * 100),
-                "pipeline_used": True,
-                "execution_steps": result.get("execution_details", {}).get("steps", []),
-            },
-        )
+    async def _attest_result(
+        self, model: str, result: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        生成证明，返回 (system_fingerprint, SSSEA 扩展 metadata)
+
+        证明包含签名（首次调用还要生成密钥），属于CPU密集操作，放到线程中执行，
+        避免阻塞事件循环上的其他请求。关闭 OML 证明时直接返回固定字段。
+        """
+        verdict = result.get("verdict", {})
+        if self.settings.oml_attestation_enabled:
+            attestation = await asyncio.to_thread(
+                generate_attestation_metadata,
+                simulation_result={
+                    "risk_level": verdict.get("risk_level", "UNKNOWN"),
+                    "confidence": verdict.get("confidence", 0.7),
+                },
+                model_name=model,
+            )
+        else:
+            attestation = _ATTESTATION_DISABLED
+        return attestation["system_fingerprint"], {
+            "oml_attestation": attestation["oml_attestation"],
+            "risk_level": verdict.get("risk_level", "UNKNOWN"),
+            "risk_score": int(verdict.get("confidence", 0.7) * 100),
+            "pipeline_used": True,
+            # 结果可能来自缓存，复制后再放入响应
+            "execution_steps": copy.deepcopy(result.get("execution_details", {}).get("steps", [])),
+        }
 
     def _format_result_message(self, result: dict[str, Any]) -> str:
         """格式化结果消息"""
         verdict = result.get("verdict", {})
         risk_level = verdict.get("risk_level", "UNKNOWN")
 
-        risk_emoji = {
-            "SAFE": "✅",
-            "WARNING": "⚠️",
-            "CRITICAL": "🚨",
-        }
-
-        emoji = risk_emoji.get(risk_level, "")
-        lines = [
-            f"{emoji} **安全审计结果**: {risk_level}",
-            f"**置信度**: {verdict.get('confidence', 0.7):.0%}",
-            "",
-            f"**摘要**: {result.get('summary', '')}",
-        ]
+        message = _RESULT_HEADER.format(
+            emoji=_RISK_EMOJI.get(risk_level, ""),
+            risk_level=risk_level,
+            confidence=verdict.get("confidence", 0.7),
+            summary=result.get("summary", ""),
+        )
 
-        findings = result.get("findings", [])
+        findings = result.get("findings")
         if findings:
-            lines.extend(["", "**检测到的问题**:"])
-            lines.extend(f"- {f}" for f in findings)
+            message += _FINDINGS_HEADING + "\n".join([f"- {f}" for f in findings])
 
-        recommendations = result.get("recommendations", [])
+        recommendations = result.get("recommendations")
         if recommendations:
-            lines.extend(["", "**建议**:"])
-            lines.extend(f"- {r}" for r in recommendations[:5])
+            message += _RECOMMENDATIONS_HEADING + "\n".join([f"- {r}" for r in recommendations[:5]])
 
-        return "\n".join(lines)
+        return message
 
     async def _handle_chat(
         self,
         request: ChatCompletionRequest,
-    ) -> ChatCompletionResponse:
+    ) -> ChatCompletionDict:
         """处理普通聊天请求"""
-        response = ChatCompletionResponse(
-            id=f"chatcmpl-{uuid.uuid4().hex[:28]}",
-            created=int(time.time()),
-            model=request.model,
-            choices=[
-                {
-                    "index": 0,
-                    "message": {
-                        "role": "assistant",
-                        "content": (
-                            "我是 SSSEA 安全审计 Agent，基于 ROMA 框架进行递归推理分析。"
-                            "请使用 simulate_tx 工具来审计 Web3 交易。"
-                        ),
-                    },
-                    "finish_reason": "stop",
-                }
-            ],
-            usage=Usage(
-                prompt_tokens=10,
-                completion_tokens=25,
-                total_tokens=35,
-            ),
-            system_fingerprint=f"sssea-roma@{uuid.uuid4().hex[:8]}",
+        return _completion_dict(
+            request.model,
+            _CHAT_REPLY,
+            prompt_tokens=10,
+            completion_tokens=25,
+            system_fingerprint=f"sssea-roma@{_rid(8)}",
         )
 
-        return response
-
     def _extract_transaction_params(
         self,
         request: ChatCompletionRequest,
@@ -375,21 +749,27 @@ class SSSEAHandler:
         2. 用户消息中的 JSON
         3. 消息文本解析
         """
-        # 检查最后一条消息是否有 tool_calls
-        for msg in reversed(request.messages):
-            if msg.tool_calls:
-                for call in msg.tool_calls:
-                    if call.get("function", {}).get("name") == "simulate_tx":
-                        args = json.loads(call["function"]["arguments"])
-                        return args.get("user_intent", ""), args
+        messages = request.messages
+        last_message = messages[-1]
+
+        # 检查 tool_calls：绝大多数请求只需看最后一条消息，找不到再向前扫描
+        call = _find_simulate_call(last_message)
+        if call is None:
+            for i in range(len(messages) - 2, -1, -1):
+                call = _find_simulate_call(messages[i])
+                if call is not None:
+                    break
+        if call is not None:
+            # 缓存的解析结果在请求间共享，返回浅拷贝
+            args = dict(_parse_tool_arguments(call.function.arguments))
+            return args.get("user_intent", ""), args
 
         # 尝试从最后一条消息解析 JSON
-        last_message = request.messages[-1]
         try:
-            data = json.loads(last_message.content)
+            data = orjson.loads(last_message.content)
             if "tx_from" in data and "tx_to" in data:
                 return data.get("user_intent", ""), data
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
         # 默认返回示例
@@ -410,29 +790,15 @@ class SSSEAHandler:
 def create_chat_completion_response(
     model: str,
     content: str,
-    tool_calls: list[dict[str, Any]] | None = None,
+    tool_calls: list[ToolCallDict] | None = None,
     metadata: dict[str, Any] | None = None,
-) -> ChatCompletionResponse:
+) -> ChatCompletionDict:
     """创建 Chat Completion 响应的便捷函数"""
-    return ChatCompletionResponse(
-        id=f"chatcmpl-{uuid.uuid4().hex[:28]}",
-        created=int(time.time()),
-        model=model,
-        choices=[
-            {
-                "index": 0,
-                "message": {
-                    "role": "assistant",
-                    "content": content,
-                    **({"tool_calls": tool_calls} if tool_calls else {}),
-                },
-                "finish_reason": "tool_calls" if tool_calls else "stop",
-            }
-        ],
-        usage=Usage(
-            prompt_tokens=0,
-            completion_tokens=0,
-            total_tokens=0,
-        ),
+    return _completion_dict(
+        model,
+        content,
+        prompt_tokens=0,
+        completion_tokens=0,
+        tool_calls=tool_calls or None,
         metadata=metadata,
     )
@@ -9,12 +9,14 @@ import base64
 import hashlib
 import json
 import logging
+import threading
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
+import orjson
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +58,13 @@ class OMLAttestationQuote:
             "timestamp": self.timestamp.isoformat(),
         }
 
+    def to_bytes(self) -> bytes:
+        """规范化 JSON 字节（键排序），签名与 Base64 编码使用同一份字节"""
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SORT_KEYS)
+
     def to_base64(self) -> str:
         """转换为 Base64 编码的字符串（用于 API 响应）"""
-        data = json.dumps(self.to_dict()).encode()
-        return base64.b64encode(data).decode()
+        return base64.b64encode(self.to_bytes()).decode()
 
     @classmethod
     def from_simulation_result(
@@ -74,7 +79,8 @@ class OMLAttestationQuote:
             result: 模拟执行结果
             tee_fingerprint: TEE 硬件指纹
         """
-        # 计算 PCR0（基于模拟结果的 hash）
+        # 计算 PCR0（基于模拟结果的 hash）；度量编码是证明值的一部分，保持标准库 json 的
+        # 默认格式（键排序、", " / ": " 分隔符），以免 PCR0 与 user_data 随序列化库变化
         result_hash = hashlib.sha256(json.dumps(result, sort_keys=True).encode()).hexdigest()
 
         return cls(
@@ -112,15 +118,20 @@ class MockAttestationProvider:
         """
         self.tee_fingerprint = tee_fingerprint or self.MOCK_TEE_FINGERPRINT
         self._signature_key = self._generate_mock_key()
-
-    def _generate_mock_key(self) -> rsa.RSAPrivateKey:
-        """生成 Mock 签名密钥"""
-        return rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend(),
+        # 公钥固定不变，PEM 只序列化一次
+        self._public_key_pem = (
+            self._signature_key.public_key()
+            .public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            .decode()
         )
 
+    def _generate_mock_key(self) -> ed25519.Ed25519PrivateKey:
+        """生成 Mock 签名密钥（Ed25519，签名比 RSA-2048 PSS 快一个数量级，签名仅 64 字节）"""
+        return ed25519.Ed25519PrivateKey.generate()
+
     def generate_attestation(
         self,
         simulation_result: dict[str, Any],
@@ -145,16 +156,11 @@ class MockAttestationProvider:
 
         生产环境应使用硬件私钥签名。
         """
-        quote_data = json.dumps(quote.to_dict(), sort_keys=True).encode()
-        signature = self._signature_key.sign(
-            quote_data,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH,
-            ),
-            hashes.SHA256(),
-        )
-        return base64.b64encode(signature).decode()
+        return self._sign_bytes(quote.to_bytes())
+
+    def _sign_bytes(self, quote_data: bytes) -> str:
+        """对证明字节签名，返回 Base64 编码的签名"""
+        return base64.b64encode(self._signature_key.sign(quote_data)).decode()
 
     def generate_full_attestation(
         self,
@@ -170,22 +176,17 @@ class MockAttestationProvider:
             完整的证明数据
         """
         quote = self.generate_attestation(simulation_result)
-        signature = self.sign_quote(quote)
+        quote_data = quote.to_bytes()
 
         return {
-            "quote": quote.to_base64(),
-            "signature": signature,
-            "public_key": self._get_public_key_pem(),
+            "quote": base64.b64encode(quote_data).decode(),
+            "signature": self._sign_bytes(quote_data),
+            "public_key": self._public_key_pem,
         }
 
     def _get_public_key_pem(self) -> str:
         """获取公钥 PEM 格式"""
-        public_key = self._signature_key.public_key()
-        pem = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
-        return pem.decode()
+        return self._public_key_pem
 
     def verify_quote(self, quote_b64: str, signature_b64: str) -> bool:
         """
@@ -198,15 +199,7 @@ class MockAttestationProvider:
             signature = base64.b64decode(signature_b64)
             public_key = self._signature_key.public_key()
 
-            public_key.verify(
-                signature,
-                quote_data,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH,
-                ),
-                hashes.SHA256(),
-            )
+            public_key.verify(signature, quote_data)
             return True
         except Exception as e:
             logger.error(f"证明验证失败: {e}")
@@ -236,7 +229,10 @@ class SystemFingerprint:
             "tee": tee_fingerprint[:8],
             **(additional_info or {}),
         }
-        hash_part = hashlib.sha256(json.dumps(info, sort_keys=True).encode()).hexdigest()[:8]
+        # 仅作短标识，无需密码学强度；4 字节 BLAKE2b 直接得到 8 位十六进制
+        hash_part = hashlib.blake2b(
+            orjson.dumps(info, option=orjson.OPT_SORT_KEYS), digest_size=4
+        ).hexdigest()
         return f"{model_name}@{tee_fingerprint[:8]}_{hash_part}"
 
     @staticmethod
@@ -256,6 +252,8 @@ class SystemFingerprint:
 
 # 全局 Mock 证明提供者实例
 _mock_provider: MockAttestationProvider | None = None
+# 证明可能在线程池中生成，保证只创建一个提供者（即只生成一把签名密钥）
+_provider_lock = threading.Lock()
 
 
 def get_attestation_provider(
@@ -264,10 +262,18 @@ def get_attestation_provider(
     """获取全局证明提供者实例"""
     global _mock_provider
     if _mock_provider is None:
-        _mock_provider = MockAttestationProvider(tee_fingerprint)
+        with _provider_lock:
+            if _mock_provider is None:
+                _mock_provider = MockAttestationProvider(tee_fingerprint)
     return _mock_provider
 
 
+@lru_cache(maxsize=64)
+def _system_fingerprint(model_name: str, tee_fingerprint: str) -> str:
+    """系统指纹只取决于模型名与 TEE 指纹，按二者缓存"""
+    return SystemFingerprint.generate(model_name=model_name, tee_fingerprint=tee_fingerprint)
+
+
 def generate_attestation_metadata(
     simulation_result: dict[str, Any],
     model_name: str = "sssea-v1-mock",
@@ -284,10 +290,7 @@ def generate_attestation_metadata(
     """
     provider = get_attestation_provider()
     attestation = provider.generate_full_attestation(simulation_result)
-    system_fp = SystemFingerprint.generate(
-        model_name=model_name,
-        tee_fingerprint=provider.tee_fingerprint,
-    )
+    system_fp = _system_fingerprint(model_name, provider.tee_fingerprint)
 
     return {
         "oml_attestation": attestation["quote"],
@@ -59,6 +59,10 @@ class Settings(BaseSettings):
     allowed_callers: list[str] = Field(default=["*"], alias="ALLOWED_CALLERS")
     max_tx_size_bytes: int = Field(default=131072, alias="MAX_TX_SIZE_BYTES")
 
+    # Response Cache（0 表示关闭）
+    response_cache_size: int = Field(default=10_000, alias="RESPONSE_CACHE_SIZE")
+    response_cache_ttl_seconds: int = Field(default=3600, alias="RESPONSE_CACHE_TTL_SECONDS")
+
     @property
     def is_production(self) -> bool:
         """是否为生产环境"""
@@ -5,20 +5,23 @@ Sentient Security Sandbox Execution Agent
 基于 TEE 的 Web3 安全审计智能体
 """
 
+import asyncio
 import logging
 import sys
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 
 from .api.openai_compat import (
-    SIMULATE_TX_TOOL,
+    TOOLS_LIST_JSON,
     ChatCompletionRequest,
     ChatCompletionResponse,
     SSSEAHandler,
+    parse_chat_completion_request,
+    time_ticker,
 )
 from .config import get_settings
 
@@ -56,11 +59,18 @@ async def lifespan(app: FastAPI):
 
     # 初始化处理器
     app.state.handler = SSSEAHandler(settings)
+    ticker = asyncio.create_task(time_ticker())
 
     yield
 
     # 清理资源
     logger.info("SSSEA Agent 关闭中...")
+    ticker.cancel()
+    await asyncio.gather(ticker, return_exceptions=True)
+    # Pipeline 在首次模拟请求时才导入；从未加载过则无需导入整个 agents 包来关闭
+    agents = sys.modules.get(f"{__package__}.agents")
+    if agents is not None:
+        await agents.shutdown_pipelines()
 
 
 # =============================================================================
@@ -144,14 +154,17 @@ async def list_models():
 @app.get("/v1/tools")
 async def list_tools():
     """列出可用工具"""
-    return {
-        "object": "list",
-        "data": [SIMULATE_TX_TOOL],
-    }
+    return Response(content=TOOLS_LIST_JSON, media_type="application/json")
 
 
-@app.post("/v1/chat/completions", response_model=ChatCompletionResponse)
-async def chat_completions(request: ChatCompletionRequest):
+@app.post(
+    "/v1/chat/completions",
+    response_model=ChatCompletionResponse,
+    response_class=ORJSONResponse,
+)
+async def chat_completions(
+    request: ChatCompletionRequest = Depends(parse_chat_completion_request),
+):
     """
     Chat Completion 端点（兼容 OpenAI API）
 
@@ -194,8 +207,13 @@ async def chat_completions(request: ChatCompletionRequest):
     """
     try:
         handler: SSSEAHandler = app.state.handler
+        if request.stream:
+            return StreamingResponse(
+                handler.stream_chat_completion(request), media_type="text/event-stream"
+            )
         response = await handler.handle_chat_completion(request)
-        return response
+        # handler 直接构建响应字典，交给 orjson 序列化，跳过 FastAPI 的出站校验
+        return ORJSONResponse(response)
     except Exception as e:
         logging.getLogger(__name__).error(f"处理请求失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -230,9 +248,7 @@ async def simulate_transaction(request: Request):
 
         # 获取 ROMA Pipeline
         handler: SSSEAHandler = app.state.handler
-        pipeline = handler._roma_pipeline
-        if pipeline is None:
-            raise HTTPException(status_code=500, detail="ROMA Pipeline is not initialized")
+        pipeline = await handler.get_pipeline()
 
         # 构建交易数据
         tx_data = {
@@ -9,6 +9,7 @@ import asyncio
 import logging
 import socket
 import subprocess
+import time
 from datetime import datetime
 from typing import Any
 
@@ -194,25 +195,24 @@ class AnvilScreener:
         import httpx
 
         start = datetime.now()
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "eth_blockNumber",
+            "params": [],
+            "id": 1,
+        }
 
-        while (datetime.now() - start).seconds < max_wait:
-            try:
-                response = httpx.post(
-                    rpc_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "method": "eth_blockNumber",
-                        "params": [],
-                        "id": 1,
-                    },
-                    timeout=1,
-                )
-                if response.status_code == 200:
-                    logger.debug("Anvil 就绪")
-                    return
-            except Exception:
-                pass
-            time.sleep(0.1)
+        # 轮询期间复用同一个客户端及其连接池
+        with httpx.Client(timeout=1) as client:
+            while (datetime.now() - start).seconds < max_wait:
+                try:
+                    response = client.post(rpc_url, json=payload)
+                    if response.status_code == 200:
+                        logger.debug("Anvil 就绪")
+                        return
+                except Exception:
+                    pass
+                time.sleep(0.1)
 
         raise RuntimeError(f"Anvil 启动超时: {rpc_url}")
 
@@ -256,6 +256,9 @@ class AnvilScreener:
         snapshot_id = self.w3.eth.snapshot()
 
         try:
+            # 状态覆盖在快照内生效，恢复快照时一并撤销
+            self._apply_state_overrides(request)
+
             # 获取执行前余额
             before_balances = await self._get_balances(
                 request.tx_from, request.tx_to, request.tx_value
@@ -358,6 +361,25 @@ class AnvilScreener:
 
         return changes
 
+    def _apply_state_overrides(self, request: SimulationRequest) -> None:
+        """
+        应用状态覆盖
+
+        - increase_balance: 发起地址余额设为 value + 1000 ETH，排除余额不足导致的失败
+        - modify_timestamp: 下一个区块时间戳设为当前时间，排除分叉区块过旧导致的 deadline 失败
+        """
+        for override in request.state_overrides:
+            if override == "increase_balance":
+                value = request.tx_value
+                value_wei = int(value, 16) if value.startswith("0x") else int(value)
+                self.w3.provider.make_request(
+                    "anvil_setBalance", [request.tx_from, hex(value_wei + 1000 * 10**18)]
+                )
+            elif override == "modify_timestamp":
+                self.w3.provider.make_request("evm_setNextBlockTimestamp", [int(time.time())])
+            else:
+                logger.warning(f"未知的状态覆盖策略: {override}")
+
     async def _execute_transaction(
         self, request: SimulationRequest
     ) -> tuple[str, dict[str, Any], Any]:
@@ -388,7 +410,9 @@ class AnvilScreener:
             tx_hash = self.w3.eth.send_transaction(tx)
 
             # 等待交易确认
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout)
+            receipt = self.w3.eth.wait_for_transaction_receipt(
+                tx_hash, timeout=request.timeout or self.timeout
+            )
 
             # 获取 trace（如果支持）
             trace = None
@@ -135,6 +135,11 @@ class SimulationRequest(BaseModel):
     fork_block: int | None = Field(None, description="分叉区块号（默认最新）")
     gas_limit: int = Field(default=30_000_000, description="gas 限制")
     trace_depth: int = Field(default=10, description="最大跟踪深度")
+    timeout: int | None = Field(None, description="交易确认超时（秒），默认使用节点配置")
+    state_overrides: list[str] = Field(
+        default_factory=list,
+        description="执行前应用的状态覆盖（increase_balance, modify_timestamp）",
+    )
 
     # 额外上下文
     context: dict[str, Any] = Field(default_factory=dict, description="额外的上下文信息")
@@ -5,6 +5,7 @@ AnvilToolkit - EVM 模拟工具集
 提供EVM交易模拟、状态查询、trace分析等功能。
 """
 
+import asyncio
 import logging
 from typing import Any
 
@@ -44,21 +45,34 @@ class AnvilToolkit(BaseToolkit):
         # 初始化进程池
         self._pool: AnvilScreenerPool | None = None
         self._screener: AnvilScreener | None = None
+        # 串行化节点启动，避免并发请求各自拉起一个Anvil进程
+        self._start_lock = asyncio.Lock()
 
     async def _get_screener(self) -> AnvilScreener:
         """获取或创建AnvilScreener实例"""
         if self._screener is None:
-            self._screener = AnvilScreener(
-                fork_url=self.fork_url,
-                fork_block=self.fork_block,
-                anvil_path=self.anvil_path,
-                base_port=self.base_port,
-                timeout=self.timeout,
-            )
-            if not self._screener.is_running:
-                self._screener.start()
+            async with self._start_lock:
+                if self._screener is None:
+                    screener = AnvilScreener(
+                        fork_url=self.fork_url,
+                        fork_block=self.fork_block,
+                        anvil_path=self.anvil_path,
+                        base_port=self.base_port,
+                        timeout=self.timeout,
+                    )
+                    await self._start_screener(screener)
+                    self._screener = screener
         return self._screener
 
+    async def _start_screener(self, screener: AnvilScreener) -> None:
+        """
+        启动Anvil节点
+
+        start() 启动进程后同步轮询直到节点就绪（最长约10秒），放到线程中执行，
+        等待期间事件循环可以继续处理其他协程。
+        """
+        await asyncio.to_thread(screener.start)
+
     async def validate_input(self, **kwargs) -> tuple[bool, str | None]:
         """验证输入参数"""
         action = kwargs.get("action")
@@ -113,6 +127,8 @@ class AnvilToolkit(BaseToolkit):
         tx_data: str = "0x",
         chain_id: int = 1,
         fork_block: int | None = None,
+        timeout: int | None = None,
+        state_overrides: list[str] | None = None,
         **kwargs,
     ) -> ToolkitResult:
         """
@@ -126,6 +142,8 @@ class AnvilToolkit(BaseToolkit):
             tx_data: 交易calldata
             chain_id: 链ID
             fork_block: 分叉区块号
+            timeout: 交易确认超时（秒），重试时由Executor按策略放宽
+            state_overrides: 执行前应用的状态覆盖策略
 
         Returns:
             ToolkitResult: 包含模拟执行结果
@@ -141,12 +159,18 @@ class AnvilToolkit(BaseToolkit):
             tx_value=tx_value,
             tx_data=tx_data,
             fork_block=fork_block,
+            timeout=timeout,
+            state_overrides=state_overrides or [],
         )
 
         try:
             # 执行模拟
             result: SimulationResult = await screener.simulate(request)
 
+            call_traces = result.call_traces[:50]  # 限制trace数量
+            # 预先计算最大调用深度，聚合时无需逐个访问trace字典
+            max_depth = max((t.depth for t in call_traces), default=0)
+
             # 转换为字典格式
             return ToolkitResult(
                 success=True,
@@ -189,8 +213,9 @@ class AnvilToolkit(BaseToolkit):
                             "gas_used": t.gas_used,
                             "error": t.error,
                         }
-                        for t in result.call_traces[:50]  # 限制trace数量
+                        for t in call_traces
                     ],
+                    "max_call_depth": max_depth,
                     "events": [
                         {
                             "address": e.address,
@@ -316,7 +341,9 @@ class AnvilToolkit(BaseToolkit):
         """启动Anvil节点"""
         try:
             screener = await self._get_screener()
-            screener.start()
+            if not screener.is_running:
+                async with self._start_lock:
+                    await self._start_screener(screener)
 
             return ToolkitResult(
                 success=True,
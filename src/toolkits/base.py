@@ -148,6 +148,10 @@ class ToolkitRegistry:
         """获取指定名称的Toolkit"""
         return self._tools.get(name)
 
+    def __len__(self) -> int:
+        """已注册工具数量"""
+        return len(self._tools)
+
     def list_tools(self) -> list[str]:
         """列出所有已注册的Toolkit名称"""
         return list(self._tools.keys())
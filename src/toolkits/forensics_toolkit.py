@@ -13,6 +13,16 @@ from .base import BaseToolkit, ToolkitResult
 logger = logging.getLogger(__name__)
 
 
+def max_call_depth(call_traces: list[dict[str, Any]]) -> int:
+    """计算调用trace的最大深度"""
+    max_depth = 0
+    for trace in call_traces:
+        depth = trace.get("depth", 0)
+        if depth > max_depth:
+            max_depth = depth
+    return max_depth
+
+
 # 危险函数签名库
 DANGEROUS_SELECTORS = {
     # 授权相关
@@ -149,7 +159,7 @@ class ForensicsToolkit(BaseToolkit):
 
         # 统计调用信息
         call_count = len(call_traces)
-        max_depth = max((t.get("depth", 0) for t in call_traces), default=0)
+        max_depth = max_call_depth(call_traces)
 
         # 分析调用链
         call_chain = self._analyze_call_chain(call_traces)
@@ -371,7 +381,7 @@ class ForensicsToolkit(BaseToolkit):
 
         # 检查调用深度
         if call_traces:
-            max_depth = max((t.get("depth", 0) for t in call_traces), default=0)
+            max_depth = max_call_depth(call_traces)
             if max_depth > 30:
                 risks.append(
                     {
@@ -0,0 +1,225 @@
+"""
+ROMA Agents Unit Tests
+"""
+
+import pytest
+
+from src.agents.aggregator import AggregatorAgent
+from src.agents.base import AgentContext
+from src.agents.executor import ExecutorAgent
+from src.agents.perception import _parse_intent
+from src.agents.planner import CycleDetectedError, PlannerAgent
+from src.agents.reflection import FailureFlag, ReflectionAgent
+from src.toolkits.base import ToolkitResult
+
+
+class RecordingTool:
+    """记录调用参数的假工具"""
+
+    timeout = 30
+
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    async def __call__(self, action: str, **kwargs) -> ToolkitResult:
+        self.calls.append({"action": action, **kwargs})
+        return ToolkitResult(
+            success=True,
+            tool_name="anvil_simulator",
+            execution_time=0.0,
+            data={},
+        )
+
+
+def _simulate_calls(tool: RecordingTool) -> list[dict]:
+    return [c for c in tool.calls if c["action"] == "simulate_tx"]
+
+
+class TestExecutorRetryStrategy:
+    """测试Executor按重试策略调整模拟参数"""
+
+    @pytest.mark.asyncio
+    async def test_increase_timeout(self):
+        """测试 increase_timeout 策略放宽第二次模拟的超时"""
+        tool = RecordingTool()
+        executor = ExecutorAgent({}, {"anvil_simulator": tool})
+        context = AgentContext(user_intent="swap", metadata={"key_params": {"tx_value": "0"}})
+
+        await executor.execute(context)
+        context.metadata["retry_strategy"] = {
+            "type": "increase_timeout",
+            "params": {"timeout_multiplier": 2},
+        }
+        await executor.execute(context)
+
+        first, second = _simulate_calls(tool)
+        assert "timeout" not in first
+        assert second["timeout"] == 60
+
+    @pytest.mark.asyncio
+    async def test_state_override(self):
+        """测试 state_override 策略把状态覆盖传给模拟"""
+        tool = RecordingTool()
+        executor = ExecutorAgent({}, {"anvil_simulator": tool})
+        original = {"success": False, "error": "insufficient funds"}
+        context = AgentContext(user_intent="swap", simulation_result=original)
+        context.metadata["retry_strategy"] = {
+            "type": "state_override",
+            "params": {"strategies": ["increase_balance"]},
+        }
+
+        await executor.execute(context)
+
+        (call,) = _simulate_calls(tool)
+        assert call["state_overrides"] == ["increase_balance"]
+        # 覆盖状态后的重跑只作诊断，原始失败结果仍作为评估依据
+        assert context.simulation_result is original
+        override = context.metadata["override_simulation"]
+        assert override["state_overrides"] == ["increase_balance"]
+        assert override["result"]["success"]
+
+
+class TestAggregatorOverride:
+    """测试Aggregator对状态覆盖重跑的处理"""
+
+    @pytest.mark.asyncio
+    async def test_override_run_is_diagnostic_only(self):
+        """测试状态覆盖重跑成功时报告列出覆盖项，评估仍基于原始失败结果"""
+        context = AgentContext(user_intent="swap", simulation_result={"success": False})
+        context.metadata["override_simulation"] = {
+            "state_overrides": ["increase_balance"],
+            "result": {"success": True, "data": {"risk_score": 0.0}},
+        }
+
+        report = (await AggregatorAgent({}, {}).execute(context)).data
+
+        assert "交易模拟失败" in report["execution_details"]["summary"]
+        (evidence,) = [e for e in report["evidence"] if e["type"] == "state_override_simulation"]
+        assert evidence["state_overrides"] == ["increase_balance"]
+        assert evidence["success"]
+
+
+class TestExecutorPlan:
+    """测试Executor按计划执行"""
+
+    @pytest.mark.asyncio
+    async def test_single_task_plan(self):
+        """测试单任务计划（带并行组）走快速路径，结果按任务ID返回"""
+        tool = RecordingTool()
+        executor = ExecutorAgent({}, {"anvil_simulator": tool})
+        executor._execute_parallel = None  # 快速路径不应进入分组调度
+        task = {"id": "simulate_tx", "tool": "anvil_simulator", "action": "simulate_tx"}
+        context = AgentContext(user_intent="swap")
+        context.metadata["plan"] = {
+            "execution_plan": {"tasks": [task], "parallel_groups": [["simulate_tx"]]}
+        }
+
+        result = await executor.execute(context)
+
+        assert result.success
+        assert result.confidence == 1.0
+        assert context.simulation_result is result.data["simulate_tx"]
+
+
+class TestPerceptionIntent:
+    """测试Perception意图解析"""
+
+    def test_keywords_case_insensitive(self):
+        """测试关键词忽略大小写，多个关键词按优先级取意图"""
+        assert _parse_intent("Approve then SWAP 1 ETH")[0] == "swap"
+
+    def test_non_ascii_case_folding_ignored(self):
+        """测试非 ASCII 大小写变体（如长 s）不被当作关键词"""
+        assert _parse_intent("\u017fwap 1 eth")[0] == "unknown"
+
+
+def _subtask(task_id: str, *depends_on: str, priority: str = "medium") -> dict:
+    return {"id": task_id, "priority": priority, "depends_on": depends_on, "tool": "t"}
+
+
+class TestPlannerDag:
+    """测试Planner按层拓扑排序生成并行组"""
+
+    @pytest.mark.asyncio
+    async def test_waves(self):
+        """测试每层入度为0的任务构成一个并行组，层内按优先级、ID排序"""
+        planner = PlannerAgent({}, {})
+        plan = await planner._plan_dag(
+            [
+                _subtask("report", "trace", "attack"),
+                _subtask("trace", "simulate"),
+                _subtask("attack", "simulate", priority="high"),
+                _subtask("simulate", "start", priority="critical"),
+                _subtask("start", priority="critical"),
+                _subtask("static"),
+            ]
+        )
+
+        assert plan["parallel_groups"] == [
+            ["start", "static"],
+            ["simulate"],
+            ["attack", "trace"],
+            ["report"],
+        ]
+        assert [t["id"] for t in plan["tasks"]] == [
+            "start",
+            "static",
+            "simulate",
+            "attack",
+            "trace",
+            "report",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cycle_rejected(self):
+        """测试循环依赖抛出 CycleDetectedError"""
+        planner = PlannerAgent({}, {})
+        with pytest.raises(CycleDetectedError, match="a"):
+            await planner._plan_dag([_subtask("a", "b"), _subtask("b", "a"), _subtask("c")])
+
+    @pytest.mark.asyncio
+    async def test_missing_dependency_rejected(self):
+        """测试依赖不存在的任务无法排序"""
+        planner = PlannerAgent({}, {})
+        with pytest.raises(CycleDetectedError):
+            await planner._plan_dag([_subtask("a", "missing")])
+
+
+class TestReflectionFlags:
+    """测试Reflection的失败标记与重试决策"""
+
+    @pytest.mark.asyncio
+    async def test_simulation_failure_sets_flag(self):
+        """测试模拟失败标记 SIM_FAIL 并给出状态覆盖重试"""
+        reflection = ReflectionAgent({"max_retries": 1}, {})
+        context = AgentContext(user_intent="swap", simulation_result={"success": False})
+
+        result = await reflection.execute(context)
+
+        assert result.data["quality_assessment"]["flags"] == FailureFlag.SIM_FAIL
+        assert result.data["failure_analysis"]["failure_types"] == ["execution_error"]
+        assert result.data["retry_decision"]["retry_strategy"]["type"] == "state_override"
+        assert result.next_step == "executor"
+
+    @pytest.mark.asyncio
+    async def test_retry_budget(self):
+        """测试重试次数用尽后交给Aggregator"""
+        reflection = ReflectionAgent({"max_retries": 1}, {})
+        context = AgentContext(user_intent="swap", simulation_result={"success": False})
+
+        await reflection.execute(context)
+        result = await reflection.execute(context)
+
+        assert result.next_step == "aggregator"
+
+    @pytest.mark.asyncio
+    async def test_success_fast_path(self):
+        """测试无失败无异常时不标记、不重试"""
+        reflection = ReflectionAgent({}, {})
+        context = AgentContext(user_intent="swap", simulation_result={"success": True})
+
+        result = await reflection.execute(context)
+
+        assert result.data["failure_analysis"]["flags"] == FailureFlag(0)
+        assert not result.data["retry_decision"]["should_retry"]
+        assert result.next_step == "aggregator"
@@ -0,0 +1,277 @@
+"""
+OpenAI Compatible API Unit Tests
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.api.openai_compat import (
+    SIMULATE_TX_TOOL,
+    ChatCompletionRequest,
+    SSSEAHandler,
+    _rid,
+    create_chat_completion_response,
+)
+
+TX_PARAMS = {
+    "chain_id": 1,
+    "tx_from": "0x" + "1" * 40,
+    "tx_to": "0x" + "2" * 40,
+    "tx_value": "0",
+    "tx_data": "0x",
+}
+
+
+class FakePipeline:
+    """记录运行次数、在 release 置位前阻塞的假 Pipeline"""
+
+    def __init__(self):
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def run(self, user_intent: str, tx_data: dict) -> dict:
+        self.runs += 1
+        await self.release.wait()
+        return {
+            "success": True,
+            "verdict": {"risk_level": "SAFE", "confidence": 0.9},
+            "summary": user_intent,
+            "execution_details": {"steps": ["perception", "executor"]},
+        }
+
+    async def run_stream(self, user_intent: str, tx_data: dict):
+        for stage in ("perception", "executor", "reflection"):
+            yield {"stage": stage}
+        yield {"stage": "done", "report": await self.run(user_intent, tx_data)}
+
+
+@pytest.fixture
+def pipeline():
+    """替换共享的 Pipeline，并清空进行中的任务与响应缓存"""
+    fake = FakePipeline()
+    SSSEAHandler._roma_pipeline = fake
+    SSSEAHandler._inflight.clear()
+    SSSEAHandler._response_cache.clear()
+    yield fake
+    SSSEAHandler._roma_pipeline = None
+    SSSEAHandler._inflight.clear()
+    SSSEAHandler._response_cache.clear()
+
+
+def _handler(**settings) -> SSSEAHandler:
+    defaults = {
+        "response_cache_size": 0,
+        "response_cache_ttl_seconds": 3600,
+        "oml_attestation_enabled": False,
+    }
+    return SSSEAHandler(SimpleNamespace(**(defaults | settings)))
+
+
+def _request(model: str = "sssea-v1-mock", **fields) -> ChatCompletionRequest:
+    return ChatCompletionRequest.model_validate(
+        {"model": model, "messages": [{"role": "user", "content": "audit"}], **fields}
+    )
+
+
+class TestCompletionResponse:
+    """测试 Chat Completion 响应格式"""
+
+    def test_plain_reply_omits_tool_calls(self):
+        """测试无工具调用时消息中不含 tool_calls 键"""
+        response = create_chat_completion_response("sssea-v1-mock", "hello")
+        choice = response["choices"][0]
+        assert "tool_calls" not in choice["message"]
+        assert choice["finish_reason"] == "stop"
+
+    def test_tool_calls_included(self):
+        """测试有工具调用时消息包含 tool_calls"""
+        call = {
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "simulate_tx", "arguments": "{}"},
+        }
+        response = create_chat_completion_response("sssea-v1-mock", "", tool_calls=[call])
+        choice = response["choices"][0]
+        assert choice["message"]["tool_calls"] == [call]
+        assert choice["finish_reason"] == "tool_calls"
+
+
+class TestPipelineInit:
+    """测试 Pipeline 延迟初始化"""
+
+    def test_create_pipeline_loads_profile(self):
+        """测试首次使用时按 profile 加载配置并创建 Pipeline"""
+        from src.agents import SSSEAPipeline
+
+        pipeline = _handler(api_reload=True)._create_pipeline()
+        assert isinstance(pipeline, SSSEAPipeline)
+
+
+class TestInflightCoalescing:
+    """测试并发请求合并"""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_run(self, pipeline):
+        """测试相同的并发请求只运行一次 Pipeline"""
+        handler = _handler()
+        tasks = [
+            asyncio.create_task(handler._handle_with_pipeline(_request(), "swap", TX_PARAMS))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        pipeline.release.set()
+        responses = await asyncio.gather(*tasks)
+
+        assert pipeline.runs == 1
+        assert len({r["id"] for r in responses}) == 3
+
+    @pytest.mark.asyncio
+    async def test_any_tx_field_difference_runs_separately(self, pipeline):
+        """测试交易参数任一字段不同的请求不合并"""
+        handler = _handler()
+        other = TX_PARAMS | {"gas": 21000}
+        tasks = [
+            asyncio.create_task(handler._handle_with_pipeline(_request(), "swap", params))
+            for params in (TX_PARAMS, other)
+        ]
+        await asyncio.sleep(0)
+        pipeline.release.set()
+        await asyncio.gather(*tasks)
+
+        assert pipeline.runs == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_others(self, pipeline):
+        """测试取消一个等待者不影响其他等待同一结果的请求"""
+        handler = _handler()
+        first, second = (
+            asyncio.create_task(handler._handle_with_pipeline(_request(), "swap", TX_PARAMS))
+            for _ in range(2)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        pipeline.release.set()
+        response = await second
+
+        assert first.cancelled()
+        assert pipeline.runs == 1
+        assert response["choices"][0]["finish_reason"] == "tool_calls"
+
+
+class TestResultCache:
+    """测试分析结果缓存"""
+
+    @pytest.fixture(autouse=True)
+    def _released(self, pipeline):
+        pipeline.release.set()
+
+    @pytest.mark.asyncio
+    async def test_hit_rebuilds_per_response_fields(self, pipeline, monkeypatch):
+        """测试命中时不重跑 Pipeline，但重新生成证明与各响应字段"""
+        attestations = []
+
+        def fake_attestation(simulation_result, model_name):
+            attestations.append(model_name)
+            return {
+                "oml_attestation": f"quote-{len(attestations)}",
+                "oml_signature": "sig",
+                "system_fingerprint": f"fp-{len(attestations)}",
+            }
+
+        monkeypatch.setattr("src.api.openai_compat.generate_attestation_metadata", fake_attestation)
+        handler = _handler(response_cache_size=10, oml_attestation_enabled=True)
+
+        first = await handler._handle_with_pipeline(_request(), "swap", TX_PARAMS)
+        first["metadata"]["execution_steps"].append("mutated")
+        second = await handler._handle_with_pipeline(_request(), "swap", TX_PARAMS)
+
+        assert pipeline.runs == 1
+        assert len(attestations) == 2
+        assert first["id"] != second["id"]
+        assert second["system_fingerprint"] == "fp-2"
+        assert second["metadata"]["oml_attestation"] == "quote-2"
+        assert second["metadata"]["execution_steps"] == ["perception", "executor"]
+        first_call = first["choices"][0]["message"]["tool_calls"][0]
+        second_call = second["choices"][0]["message"]["tool_calls"][0]
+        assert first_call["id"] != second_call["id"]
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_reruns(self, pipeline):
+        """测试过期条目不再命中"""
+        handler = _handler(response_cache_size=10, response_cache_ttl_seconds=0)
+        for _ in range(2):
+            await handler._handle_with_pipeline(_request(), "swap", TX_PARAMS)
+        assert pipeline.runs == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, pipeline):
+        """测试超出容量时淘汰最久未使用的条目"""
+        handler = _handler(response_cache_size=1)
+        for intent in ("swap", "approve", "swap"):
+            await handler._handle_with_pipeline(_request(), intent, TX_PARAMS)
+        assert pipeline.runs == 3
+        assert len(SSSEAHandler._response_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_when_size_zero(self, pipeline):
+        """测试 response_cache_size=0 时关闭缓存"""
+        handler = _handler(response_cache_size=0)
+        for _ in range(2):
+            await handler._handle_with_pipeline(_request(), "swap", TX_PARAMS)
+        assert pipeline.runs == 2
+        assert not SSSEAHandler._response_cache
+
+
+async def _collect(stream) -> list[bytes]:
+    return [event async for event in stream]
+
+
+def _payload(event: bytes) -> dict:
+    assert event.startswith(b"data: ") and event.endswith(b"\n\n")
+    return orjson.loads(event[6:])
+
+
+class TestStreaming:
+    """测试 SSE 流式响应"""
+
+    @pytest.mark.asyncio
+    async def test_plain_chat(self):
+        """测试普通聊天：角色、内容、结束块、[DONE]"""
+        events = await _collect(_handler().stream_chat_completion(_request(stream=True)))
+
+        assert events[-1] == b"data: [DONE]\n\n"
+        chunks = [_payload(e) for e in events[:-1]]
+        assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": ""}
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+        assert {c["id"] for c in chunks} == {chunks[0]["id"]}
+
+    @pytest.mark.asyncio
+    async def test_simulation_stages(self, pipeline):
+        """测试模拟请求：tool_calls 增量、阶段注释、审计结果与结束块"""
+        pipeline.release.set()
+        request = _request(stream=True, tools=[dict(SIMULATE_TX_TOOL)])
+        events = await _collect(_handler().stream_chat_completion(request))
+
+        comments = [e for e in events if e.startswith(b":")]
+        assert comments == [b": perception\n\n", b": executor\n\n", b": reflection\n\n"]
+        chunks = [_payload(e) for e in events if e.startswith(b"data: {")]
+        tool_call = chunks[1]["choices"][0]["delta"]["tool_calls"][0]
+        assert tool_call["function"]["name"] == "simulate_tx"
+        assert "SAFE" in chunks[-2]["choices"][0]["delta"]["content"]
+        assert chunks[-1]["choices"][0]["finish_reason"] == "tool_calls"
+        assert chunks[-1]["metadata"]["risk_level"] == "SAFE"
+        assert events[-1] == b"data: [DONE]\n\n"
+
+
+class TestRandomIds:
+    """测试随机ID生成"""
+
+    def test_length_and_uniqueness(self):
+        """测试ID长度与唯一性，跨越随机字节池补充边界"""
+        ids = [_rid(28) for _ in range(1000)] + [_rid(24) for _ in range(1000)]
+        assert {len(i) for i in ids} == {24, 28}
+        assert len(set(ids)) == len(ids)
+        assert all(int(i, 16) >= 0 for i in ids)
@@ -0,0 +1,31 @@
+"""
+OML Attestation Unit Tests
+"""
+
+import base64
+import hashlib
+import json
+
+from src.attestation.mock_quote import MockAttestationProvider, OMLAttestationQuote
+
+
+class TestAttestationQuote:
+    """测试证明生成与验证"""
+
+    def test_pcr0_measurement_encoding(self):
+        """测试 PCR0 与 user_data 使用标准库 json 的默认编码"""
+        result = {"risk_level": "WARNING", "confidence": 0.8, "value": 10**30}
+        quote = OMLAttestationQuote.from_simulation_result(result, "a" * 64)
+
+        expected = hashlib.sha256(json.dumps(result, sort_keys=True).encode()).hexdigest()
+        assert quote.pcr0 == expected
+        assert quote.user_data == '{"risk_level": "WARNING"}'
+
+    def test_full_attestation_verifies(self):
+        """测试完整证明的签名可以用同一提供者验证"""
+        provider = MockAttestationProvider("b" * 64)
+        attestation = provider.generate_full_attestation({"risk_level": "SAFE"})
+
+        assert provider.verify_quote(attestation["quote"], attestation["signature"])
+        quote = json.loads(base64.b64decode(attestation["quote"]))
+        assert quote["tee_fingerprint"] == "b" * 64
@@ -0,0 +1,58 @@
+"""
+ROMA Configuration Loader Unit Tests
+"""
+
+import json
+
+from config.roma_config import ROMAConfig, _merge_cow, get_value, load_profile
+
+
+class TestMergeWithDefaults:
+    """测试与默认配置的合并"""
+
+    def test_explicit_null_is_kept(self):
+        """测试默认值中不存在的键显式设为 null 时保留"""
+        merged = _merge_cow({"anvil": {"timeout": 30}}, {"anvil": {"fork_block": None}})
+        assert merged["anvil"] == {"timeout": 30, "fork_block": None}
+
+    def test_equal_override_reuses_default(self):
+        """测试与默认值相等的覆盖不改变结果"""
+        merged = _merge_cow({"timeout": 300}, {"timeout": 300, "max_retries": 2})
+        assert merged == {"timeout": 300, "max_retries": 2}
+
+    def test_dev_profile_fork_block(self):
+        """测试 dev profile 中的 fork_block: null 出现在加载结果中"""
+        config = ROMAConfig("dev").load()
+        assert "fork_block" in config["toolkits"]["anvil_simulator"]
+        assert config["toolkits"]["anvil_simulator"]["fork_block"] is None
+
+
+class TestLoad:
+    """测试配置加载结果"""
+
+    def test_defaults_are_plain_containers(self):
+        """测试无 YAML 时默认值以普通 dict/list 返回，可直接 JSON 序列化"""
+        config = ROMAConfig("no-such-profile").load()
+        assert type(config["pipeline"]) is dict
+        assert type(config["pipeline"]["enabled_agents"]) is list
+        assert json.loads(json.dumps(config)) == config
+
+    def test_callers_get_independent_copies(self):
+        """测试一个调用方修改配置不影响其他调用方"""
+        first = load_profile("dev")
+        first["pipeline"]["timeout"] = 1
+        assert load_profile("dev")["pipeline"]["timeout"] == 300
+        assert ROMAConfig("dev").load()["pipeline"]["timeout"] == 300
+        assert get_value("dev", "pipeline")["timeout"] == 300
+
+    def test_reload_on_file_change(self, tmp_path):
+        """测试同一实例在配置文件变化后重新加载"""
+        config_file = tmp_path / "test.yaml"
+        config_file.write_text("pipeline:\n  timeout: 10\n")
+        config = ROMAConfig("reload-test")
+        config._config_file = lambda: config_file
+        assert config.get("pipeline.timeout") == 10
+
+        config_file.write_text("pipeline:\n  timeout: 20\n  max_retries: 5\n")
+        assert config.get("pipeline.timeout") == 20
+        assert config.load()["pipeline"]["max_retries"] == 5